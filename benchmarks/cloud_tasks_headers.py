@@ -0,0 +1,128 @@
+"""
+Compares per-request cost of the old `Header()` based CloudTasksHeaders with the cached one.
+
+python -m benchmarks.cloud_tasks_headers
+"""
+# Standard Library Imports
+import asyncio
+import time
+import typing
+from datetime import datetime
+
+# Third Party Imports
+from fastapi import Depends
+from fastapi import FastAPI
+from fastapi import Header
+
+# Imports from this repository
+from fastapi_cloud_tasks.dependencies import CloudTasksHeaders
+from fastapi_cloud_tasks.dependencies import CloudTasksHeadersMiddleware
+from fastapi_cloud_tasks.dependencies import max_retries
+
+REQUESTS = 20_000
+
+
+class HeaderParamsCloudTasksHeaders:
+    # The implementation before headers were cached on request.state
+    def __init__(
+        self,
+        x_cloudtasks_taskretrycount: typing.Optional[int] = Header(0),
+        x_cloudtasks_taskexecutioncount: typing.Optional[int] = Header(0),
+        x_cloudtasks_queuename: typing.Optional[str] = Header(""),
+        x_cloudtasks_taskname: typing.Optional[str] = Header(""),
+        x_cloudtasks_tasketa: typing.Optional[float] = Header(0),
+        x_cloudtasks_taskpreviousresponse: typing.Optional[int] = Header(0),
+        x_cloudtasks_taskretryreason: typing.Optional[str] = Header(""),
+    ) -> None:
+        self.retry_count = x_cloudtasks_taskretrycount
+        self.execution_count = x_cloudtasks_taskexecutioncount
+        self.queue_name = x_cloudtasks_queuename
+        self.task_name = x_cloudtasks_taskname
+        self.eta = datetime.fromtimestamp(x_cloudtasks_tasketa)
+        self.previous_response = x_cloudtasks_taskpreviousresponse
+        self.retry_reason = x_cloudtasks_taskretryreason
+
+
+def header_params_max_retries(count: int = 20):
+    def retries_dep(meta: HeaderParamsCloudTasksHeaders = Depends()) -> bool:
+        return meta.retry_count >= count
+
+    return retries_dep
+
+
+def make_app(headers_cls, retries, middleware=False):
+    app = FastAPI()
+    if middleware:
+        app.add_middleware(CloudTasksHeadersMiddleware)
+
+    @app.post("/task", dependencies=[Depends(retries(5))])
+    async def task(meta: headers_cls = Depends()):
+        return None
+
+    return app
+
+
+HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"x-cloudtasks-taskretrycount", b"1"),
+    (b"x-cloudtasks-taskexecutioncount", b"1"),
+    (b"x-cloudtasks-queuename", b"test-queue"),
+    (b"x-cloudtasks-taskname", b"1234567890"),
+    (b"x-cloudtasks-tasketa", b"1700000000.123"),
+    (b"x-cloudtasks-taskpreviousresponse", b"500"),
+    (b"x-cloudtasks-taskretryreason", b"HTTP 500"),
+]
+
+
+async def call(app):
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/task",
+        "raw_path": b"/task",
+        "root_path": "",
+        "query_string": b"",
+        "headers": HEADERS,
+        "client": ("127.0.0.1", 1234),
+        "server": ("127.0.0.1", 8000),
+    }
+    status = None
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    assert status == 200, status
+
+
+async def bench(name, app):
+    for _ in range(100):
+        await call(app)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        await call(app)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {elapsed / REQUESTS * 1e6:8.1f} us/request")
+
+
+async def main():
+    await bench(
+        "Header() params",
+        make_app(HeaderParamsCloudTasksHeaders, header_params_max_retries),
+    )
+    await bench("cached on request.state", make_app(CloudTasksHeaders, max_retries))
+    await bench(
+        "cached + middleware", make_app(CloudTasksHeaders, max_retries, middleware=True)
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
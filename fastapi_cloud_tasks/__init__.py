@@ -1,5 +1,6 @@
 # Imports from this repository
+from fastapi_cloud_tasks.batched_route import BatchedRouteBuilder
 from fastapi_cloud_tasks.delayed_route import DelayedRouteBuilder
 from fastapi_cloud_tasks.scheduled_route import ScheduledRouteBuilder
 
-__all__ = ["DelayedRouteBuilder", "ScheduledRouteBuilder"]
+__all__ = ["BatchedRouteBuilder", "DelayedRouteBuilder", "ScheduledRouteBuilder"]
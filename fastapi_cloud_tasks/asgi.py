@@ -0,0 +1,57 @@
+# Standard Library Imports
+from typing import Dict
+from urllib.parse import urlparse
+
+
+async def call_asgi(
+    app,
+    *,
+    method: str,
+    url: str,
+    headers: Dict[str, str] = None,
+    body: bytes = b"",
+) -> int:
+    """
+    Sends one HTTP request to an ASGI app in process and returns the response status.
+
+    Used by the local stand-ins to dispatch tasks/jobs without a network.
+    """
+    parts = urlparse(url)
+    raw_headers = [
+        (k.lower().encode("latin-1"), str(v).encode("latin-1"))
+        for (k, v) in (headers or {}).items()
+    ]
+    if parts.netloc:
+        raw_headers.append((b"host", parts.netloc.encode("latin-1")))
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": parts.scheme or "http",
+        "path": parts.path or "/",
+        "raw_path": (parts.path or "/").encode(),
+        "root_path": "",
+        "query_string": parts.query.encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": (parts.hostname or "localhost", parts.port or 80),
+    }
+    status = 500
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # Nothing more to read, the client stays connected
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body or b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
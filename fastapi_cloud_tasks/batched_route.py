@@ -0,0 +1,94 @@
+# Standard Library Imports
+from typing import Callable
+
+# Third Party Imports
+from fastapi.routing import APIRoute
+
+# Imports from this repository
+from fastapi_cloud_tasks.batcher import Batcher
+from fastapi_cloud_tasks.clients import tasks_client
+from fastapi_cloud_tasks.decorators import WORKER_OPTIONS
+from fastapi_cloud_tasks.hooks import DelayedTaskHook
+from fastapi_cloud_tasks.hooks import noop_hook
+from fastapi_cloud_tasks.utils import ensure_queue
+
+
+def BatchedRouteBuilder(
+    *,
+    base_url: str,
+    queue_path: str,
+    task_create_timeout: float = 10.0,
+    pre_create_hook: DelayedTaskHook = None,
+    client=None,
+    auto_create_queue=True,
+    max_batch_size: int = 100,
+    max_batch_bytes: int = 512 * 1024,
+    max_batch_delay: float = 1.0,
+):
+    """
+    Returns a Mixin that should be used to override route_class.
+
+    It adds a .delay and .flush methods to the original endpoint.
+    Each .delay call adds one item to a buffer, the endpoint receives the whole batch as a list.
+
+    Example:
+    ```
+      batched_router = APIRouter(route_class=BatchedRouteBuilder(...), prefix="/batched")
+
+      class Event(BaseModel):
+          name: str
+
+      @batched_router.post("/on_events")
+      def on_events(events: List[Event]):
+          # do work here
+
+      # Call .delay with a single item to add it to the batch
+      on_events.delay(events=Event(name="click"))
+
+      app.include_router(batched_router)
+    ```
+    """
+    if client is None:
+        client = tasks_client()
+
+    if pre_create_hook is None:
+        pre_create_hook = noop_hook
+
+    if auto_create_queue:
+        ensure_queue(client=client, path=queue_path)
+
+    class BatchedRouteMixin(APIRoute):
+        def get_route_handler(self) -> Callable:
+            original_route_handler = super().get_route_handler()
+            batchOpts = dict(
+                base_url=base_url,
+                queue_path=queue_path,
+                task_create_timeout=task_create_timeout,
+                client=client,
+                pre_create_hook=pre_create_hook,
+                max_batch_size=max_batch_size,
+                max_batch_bytes=max_batch_bytes,
+                max_batch_delay=max_batch_delay,
+            )
+            if hasattr(self.endpoint, "_delayOptions"):
+                batchOpts.update(
+                    {
+                        k: v
+                        for (k, v) in self.endpoint._delayOptions.items()
+                        if k not in WORKER_OPTIONS
+                    }
+                )
+            # get_route_handler runs again for every copy of the route (eg: include_router),
+            # keep a single batcher (and its buffers, timers and atexit hook) per endpoint
+            batcher = getattr(self.endpoint, "_batcher", None)
+            if batcher is None:
+                batcher = self.endpoint._batcher = Batcher(route=self, **batchOpts)
+            else:
+                # The last copy has the full path, same as .delay for delayed routes
+                batcher.route = self
+            self.batcher = batcher
+            self.endpoint.delay = self.batcher.delay
+            self.endpoint.flush = self.batcher.flush
+            return original_route_handler
+
+    return BatchedRouteMixin
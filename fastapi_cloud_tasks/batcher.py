@@ -0,0 +1,143 @@
+# Standard Library Imports
+import atexit
+import logging
+import threading
+from typing import Any
+from typing import Dict
+from typing import List
+
+# Third Party Imports
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute
+from google.cloud import tasks_v2
+
+# Imports from this repository
+from fastapi_cloud_tasks.delayer import Delayer
+from fastapi_cloud_tasks.exception import BadMethodException
+from fastapi_cloud_tasks.exception import MissingParamError
+from fastapi_cloud_tasks.hooks import DelayedTaskHook
+from fastapi_cloud_tasks.requester import json
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    def __init__(self, values: Dict[str, Any]) -> None:
+        self.values = values
+        self.items: List[Any] = []
+        self.size = 2  # "[]"
+        self.timer: threading.Timer = None
+
+
+class Batcher(Delayer):
+    """
+    Buffers body payloads for a route and sends them as a single task with a list body.
+
+    Batches are flushed when they reach `max_batch_size` items, `max_batch_bytes` of encoded body
+    or `max_batch_delay` seconds after the first item was added, whichever comes first.
+    Calls with different path/query/header values go into separate batches.
+    """
+
+    def __init__(
+        self,
+        *,
+        route: APIRoute,
+        base_url: str,
+        queue_path: str,
+        client: tasks_v2.CloudTasksClient,
+        pre_create_hook: DelayedTaskHook,
+        task_create_timeout: float = 10.0,
+        max_batch_size: int = 100,
+        max_batch_bytes: int = 512 * 1024,
+        max_batch_delay: float = 1.0,
+        **options,
+    ) -> None:
+        super().__init__(
+            route=route,
+            base_url=base_url,
+            queue_path=queue_path,
+            client=client,
+            pre_create_hook=pre_create_hook,
+            task_create_timeout=task_create_timeout,
+            **options,
+        )
+        body_field = route.body_field
+        if not body_field or not body_field.name:
+            raise BadMethodException("Batched routes need a list body parameter")
+        self.body_name = body_field.name
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_delay = max_batch_delay
+
+        self._lock = threading.Lock()
+        self._batches: Dict[str, _Batch] = {}
+        atexit.register(self.flush)
+
+    def delay(self, **kwargs):
+        """
+        Add one item to the batch. The item is passed with the name of the list body parameter.
+        """
+        if self.body_name not in kwargs:
+            raise MissingParamError(param=self.body_name)
+        item = jsonable_encoder(kwargs.pop(self.body_name))
+        item_size = len(json.dumps(item)) + 1
+
+        key = json.dumps(jsonable_encoder(kwargs), sort_keys=True)
+        full = None
+        with self._lock:
+            batch = self._batches.get(key)
+            if batch and batch.size + item_size > self.max_batch_bytes:
+                full = self._pop(key)
+                batch = None
+            if batch is None:
+                batch = self._batches[key] = _Batch(kwargs)
+                if self.max_batch_delay is not None:
+                    batch.timer = threading.Timer(
+                        self.max_batch_delay, self._flush_on_timer, args=(key, batch)
+                    )
+                    batch.timer.daemon = True
+                    batch.timer.start()
+            batch.items.append(item)
+            batch.size += item_size
+            if len(batch.items) >= self.max_batch_size:
+                self._pop(key)
+            else:
+                batch = None
+
+        if full is not None:
+            self._send(full)
+        if batch is not None:
+            return self._send(batch)
+
+    def flush(self):
+        """
+        Send all pending batches right away.
+        """
+        with self._lock:
+            batches = [self._pop(key) for key in list(self._batches)]
+        return [self._send(batch) for batch in batches]
+
+    def _pop(self, key) -> _Batch:
+        # Must be called with the lock held
+        batch = self._batches.pop(key)
+        if batch.timer is not None:
+            batch.timer.cancel()
+        return batch
+
+    def _flush_on_timer(self, key, batch):
+        with self._lock:
+            # The batch might have been flushed by size already
+            if self._batches.get(key) is not batch:
+                return
+            self._pop(key)
+        try:
+            self._send(batch)
+        except Exception:
+            logger.exception("Could not send batch for %s", self.route.unique_id)
+
+    def _send(self, batch: _Batch):
+        return super().delay(**batch.values, **{self.body_name: batch.items})
+
+    def _body(self, *, values):
+        # Items are already encoded when they are added to the batch
+        return json.dumps(values[self.body_name]).encode()
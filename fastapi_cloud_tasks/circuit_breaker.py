@@ -0,0 +1,155 @@
+# Standard Library Imports
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+# Third Party Imports
+from google.api_core.exceptions import RetryError
+from google.api_core.exceptions import ServerError
+from google.api_core.exceptions import TooManyRequests
+
+# Imports from this repository
+from fastapi_cloud_tasks.exception import CircuitOpenException
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Fails calls fast while the API is unhealthy instead of waiting for every call to time out.
+
+    Calls failing with one of `failure_exceptions`, or slower than `slow_call_duration`, count as failures.
+    The circuit opens when at least `min_calls` were made in the last `window` seconds and `failure_rate` of them failed.
+    While open, calls go to `fallback` (called with the rejected function and its arguments) or raise `CircuitOpenException`.
+    After `open_duration` seconds up to `half_open_calls` probe calls are let through, a success closes the circuit.
+
+    Share one breaker between the builders using the same client.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        slow_call_duration: float = None,
+        window: float = 30.0,
+        min_calls: int = 10,
+        open_duration: float = 30.0,
+        half_open_calls: int = 1,
+        failure_exceptions=(ServerError, TooManyRequests, RetryError),
+        fallback: Callable = None,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+        self.failure_exceptions = failure_exceptions
+        self.fallback = fallback
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        # (time, failed)
+        self._calls = deque()
+        self._failures = 0
+        self._opened_at = None
+        # Wall clock time, for monitoring
+        self._opened_at_time = None
+        self._probes = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def call(self, fn, *args, **kwargs):
+        if not self._allow():
+            if self.fallback is not None:
+                return self.fallback(fn, *args, **kwargs)
+            raise CircuitOpenException("Circuit is open")
+
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except self.failure_exceptions:
+            self._record(failed=True)
+            raise
+        except Exception:
+            # Any other error (eg: AlreadyExists) means the API answered
+            self._record(failed=self._is_slow(start))
+            raise
+        self._record(failed=self._is_slow(start))
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire(time.monotonic())
+            calls = len(self._calls)
+            return dict(
+                state=self._state,
+                calls=calls,
+                failures=self._failures,
+                failure_rate=self._failures / calls if calls else 0.0,
+                rejected=self._rejected,
+                opened_at=self._opened_at_time,
+            )
+
+    def _is_slow(self, start: float) -> bool:
+        return (
+            self.slow_call_duration is not None
+            and time.monotonic() - start > self.slow_call_duration
+        )
+
+    def _allow(self) -> bool:
+        with self._lock:
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    self._rejected += 1
+                    return False
+                self._state = HALF_OPEN
+                self._probes = 0
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self._rejected += 1
+                    return False
+                self._probes += 1
+            return True
+
+    def _record(self, *, failed: bool):
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    self._failures = 0
+                return
+            if self._state == OPEN:
+                # Calls started before the circuit opened
+                return
+            self._calls.append((now, failed))
+            self._failures += failed
+            self._expire(now)
+            calls = len(self._calls)
+            if calls >= self.min_calls and self._failures / calls >= self.failure_rate:
+                self._open(now)
+
+    def _open(self, now: float):
+        # Must be called with the lock held
+        self._state = OPEN
+        self._opened_at = now
+        self._opened_at_time = time.time()
+        self._calls.clear()
+        self._failures = 0
+
+    def _expire(self, now: float):
+        # Must be called with the lock held
+        while self._calls and now - self._calls[0][0] > self.window:
+            (_, failed) = self._calls.popleft()
+            self._failures -= failed
@@ -0,0 +1,137 @@
+# Standard Library Imports
+import os
+import threading
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+# Third Party Imports
+import grpc
+from google.cloud import scheduler_v1
+from google.cloud import tasks_v2
+from google.cloud.scheduler_v1.services import cloud_scheduler
+from google.cloud.tasks_v2.services import cloud_tasks
+
+# Keep idle channels alive through load balancers/NATs instead of reconnecting on the next call
+DEFAULT_CHANNEL_OPTIONS: Tuple[Tuple[str, int], ...] = (
+    ("grpc.keepalive_time_ms", 60_000),
+    ("grpc.keepalive_timeout_ms", 20_000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+)
+
+_lock = threading.Lock()
+_clients: Dict[tuple, object] = {}
+_pid = os.getpid()
+# Clients inherited from the parent process, kept referenced so they are never garbage collected
+# (which would close the parent's channels) in the child
+_inherited: List[object] = []
+
+
+def _reset():
+    global _pid
+    # Channels inherited from the parent process must not be used (or closed) in the child
+    _inherited.extend(_clients.values())
+    _clients.clear()
+    _pid = os.getpid()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset)
+
+
+def _get(key: tuple, factory: Callable[[], object]):
+    if _pid != os.getpid():
+        # Fork without the at-fork hook (eg: os.fork from C code)
+        _reset()
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = factory()
+    return client
+
+
+class SharedClient:
+    """
+    Forwards everything to a client shared by all SharedClients with the same config.
+
+    The underlying client (and its gRPC channel) is created lazily once per process.
+    It's safe to create a SharedClient before a pre-fork server (eg: gunicorn) forks.
+    """
+
+    def __init__(self, key: tuple, factory: Callable[[], object]) -> None:
+        self._key = key
+        self._factory = factory
+
+    @property
+    def client(self):
+        return _get(self._key, self._factory)
+
+    def __getattr__(self, name):
+        if name in ("_key", "_factory"):
+            # Not initialised yet (eg: while unpickling)
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+
+def tasks_client(
+    *,
+    host: str = None,
+    insecure: bool = False,
+    channel_options: Sequence[Tuple[str, object]] = DEFAULT_CHANNEL_OPTIONS,
+) -> tasks_v2.CloudTasksClient:
+    """
+    Returns a Cloud Tasks client that shares its channel with every other call using the same arguments.
+    """
+    channel_options = tuple(channel_options)
+
+    def factory():
+        transport = cloud_tasks.transports.CloudTasksGrpcTransport(
+            channel=_channel(
+                cloud_tasks.transports.CloudTasksGrpcTransport,
+                host,
+                insecure,
+                channel_options,
+            )
+        )
+        return tasks_v2.CloudTasksClient(transport=transport)
+
+    return SharedClient(("tasks", host, insecure, channel_options), factory)
+
+
+def scheduler_client(
+    *,
+    host: str = None,
+    insecure: bool = False,
+    channel_options: Sequence[Tuple[str, object]] = DEFAULT_CHANNEL_OPTIONS,
+) -> scheduler_v1.CloudSchedulerClient:
+    """
+    Returns a Cloud Scheduler client that shares its channel with every other call using the same arguments.
+    """
+    channel_options = tuple(channel_options)
+
+    def factory():
+        transport = cloud_scheduler.transports.CloudSchedulerGrpcTransport(
+            channel=_channel(
+                cloud_scheduler.transports.CloudSchedulerGrpcTransport,
+                host,
+                insecure,
+                channel_options,
+            )
+        )
+        return scheduler_v1.CloudSchedulerClient(transport=transport)
+
+    return SharedClient(("scheduler", host, insecure, channel_options), factory)
+
+
+def _channel(transport_cls, host, insecure, channel_options):
+    options = list(channel_options)
+    if insecure:
+        return grpc.insecure_channel(host, options=options)
+    if host is None:
+        return transport_cls.create_channel(options=options)
+    return transport_cls.create_channel(host=host, options=options)
@@ -0,0 +1,163 @@
+# Standard Library Imports
+import bisect
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import List
+
+try:
+    # Standard Library Imports
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover
+    # Third Party Imports
+    from backports.zoneinfo import ZoneInfo
+
+_MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+_MONTHS = [
+    "jan",
+    "feb",
+    "mar",
+    "apr",
+    "may",
+    "jun",
+    "jul",
+    "aug",
+    "sep",
+    "oct",
+    "nov",
+    "dec",
+]
+_DAYS = ["sun", "mon", "tue", "wed", "thu", "fri", "sat"]
+
+# Give up looking for a fire time after these many years (eg: "0 0 30 2 *")
+_MAX_YEARS = 8
+
+
+class CronSchedule:
+    """
+    Unix cron expression (the format used by Cloud Scheduler) evaluated in a time zone.
+
+    Supports `*`, ranges, steps, lists, month/day names and @daily style macros.
+    """
+
+    def __init__(self, expression: str, time_zone: str = "UTC") -> None:
+        self.expression = expression
+        self.tz = ZoneInfo(time_zone or "UTC")
+        fields = _MACROS.get(expression.strip().lower(), expression).split()
+        if len(fields) != 5:
+            raise ValueError(f"Expected 5 fields in cron expression {expression!r}")
+        (minute, hour, dom, month, dow) = fields
+        self.minutes = _parse_field(minute, 0, 59)
+        self.hours = _parse_field(hour, 0, 23)
+        self.days = _parse_field(dom, 1, 31)
+        self.months = _parse_field(month, 1, 12, _MONTHS, 1)
+        # 7 is also sunday
+        self.weekdays = sorted({d % 7 for d in _parse_field(dow, 0, 7, _DAYS, 0)})
+        # When both day fields are restricted, either of them matching is enough
+        self._day_or = dom != "*" and dow != "*"
+        self._dom_any = dom == "*"
+        self._dow_any = dow == "*"
+
+    def next_after(self, when: datetime) -> datetime:
+        """
+        Returns the first fire time strictly after `when`, as an aware datetime in the schedule's time zone.
+        """
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        local = when.astimezone(self.tz).replace(tzinfo=None, second=0, microsecond=0)
+        candidate = local + timedelta(minutes=1)
+        limit = local.year + _MAX_YEARS
+        while candidate.year <= limit:
+            found = self._next_local(candidate)
+            if found is None:
+                break
+            aware = found.replace(tzinfo=self.tz)
+            # Skip wall times that don't exist (DST gap)
+            if (
+                aware.astimezone(timezone.utc).astimezone(self.tz).replace(tzinfo=None)
+                == found
+            ):
+                if aware > when:
+                    return aware
+            candidate = found + timedelta(minutes=1)
+        raise ValueError(f"Cron expression {self.expression!r} never fires")
+
+    def _day_matches(self, d: datetime) -> bool:
+        dom = d.day in self.days
+        # isoweekday: monday=1 .. sunday=7
+        dow = d.isoweekday() % 7 in self.weekdays
+        if self._day_or:
+            return dom or dow
+        return (self._dom_any or dom) and (self._dow_any or dow)
+
+    def _next_local(self, c: datetime):
+        # Jump field by field to the next allowed value instead of stepping minute by minute
+        limit = c.year + _MAX_YEARS
+        while c.year <= limit:
+            if c.month not in self.months:
+                i = bisect.bisect_left(self.months, c.month)
+                if i == len(self.months):
+                    c = datetime(c.year + 1, self.months[0], 1)
+                else:
+                    c = datetime(c.year, self.months[i], 1)
+                continue
+            if not self._day_matches(c):
+                c = datetime(c.year, c.month, c.day) + timedelta(days=1)
+                continue
+            if c.hour not in self.hours:
+                i = bisect.bisect_left(self.hours, c.hour)
+                if i == len(self.hours):
+                    c = datetime(c.year, c.month, c.day) + timedelta(days=1)
+                else:
+                    c = c.replace(hour=self.hours[i], minute=0)
+                continue
+            if c.minute not in self.minutes:
+                i = bisect.bisect_left(self.minutes, c.minute)
+                if i == len(self.minutes):
+                    c = c.replace(minute=0) + timedelta(hours=1)
+                else:
+                    c = c.replace(minute=self.minutes[i])
+                continue
+            return c
+        return None
+
+
+def _parse_field(
+    field: str, low: int, high: int, names: List[str] = None, offset: int = 0
+) -> List[int]:
+    values = set()
+    for part in field.lower().split(","):
+        step = 1
+        if "/" in part:
+            (part, step_str) = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron field {field!r}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            (a, b) = part.split("-", 1)
+            start, end = _value(a, names, offset), _value(b, names, offset)
+        else:
+            start = _value(part, names, offset)
+            # "5/15" means from 5 to the end in steps of 15
+            end = high if step != 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field {field!r} out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+def _value(token: str, names: List[str], offset: int) -> int:
+    if names and token[:3] in names:
+        return names.index(token[:3]) + offset
+    return int(token)
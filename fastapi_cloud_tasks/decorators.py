@@ -1,3 +1,7 @@
+# Options used by the worker running the task, not passed on to Delayer
+WORKER_OPTIONS = ("profiler",)
+
+
 def task_default_options(**kwargs):
     def wrapper(fn):
         fn._delayOptions = kwargs
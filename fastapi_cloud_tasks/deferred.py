@@ -0,0 +1,254 @@
+# Standard Library Imports
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from typing import AsyncIterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+# Third Party Imports
+from fastapi import BackgroundTasks
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import tasks_v2
+from starlette.concurrency import run_in_threadpool
+
+# Imports from this repository
+from fastapi_cloud_tasks.spool import SPOOLABLE_EXCEPTIONS
+
+logger = logging.getLogger(__name__)
+
+_current_collector: ContextVar[Optional["DelayCollector"]] = ContextVar(
+    "fastapi_cloud_tasks_delay_collector", default=None
+)
+
+
+def current_collector() -> Optional["DelayCollector"]:
+    return _current_collector.get()
+
+
+class SQLiteOutbox:
+    """
+    Durable storage for task requests that haven't been confirmed by Cloud Tasks yet.
+
+    Rows are written while the request is handled and deleted once the task is created.
+    An `OutboxRelay` sends whatever is left behind (eg: by a crash).
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fastapi_cloud_tasks_outbox ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, request BLOB NOT NULL, "
+            "timeout REAL NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def put(
+        self, requests: List[Tuple[tasks_v2.CreateTaskRequest, float]]
+    ) -> List[int]:
+        now = time.time()
+        ids = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for (request, timeout) in requests:
+                    cursor = self._conn.execute(
+                        "INSERT INTO fastapi_cloud_tasks_outbox (request, timeout, created_at) VALUES (?, ?, ?)",
+                        (tasks_v2.CreateTaskRequest.serialize(request), timeout, now),
+                    )
+                    ids.append(cursor.lastrowid)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return ids
+
+    def remove(self, ids: List[int]):
+        if len(ids) == 0:
+            return
+        with self._lock:
+            self._conn.executemany(
+                "DELETE FROM fastapi_cloud_tasks_outbox WHERE id = ?",
+                [(i,) for i in ids],
+            )
+
+    def pending(
+        self, *, limit: int = 100, older_than: float = 0
+    ) -> List[Tuple[int, tasks_v2.CreateTaskRequest, float]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, request, timeout FROM fastapi_cloud_tasks_outbox WHERE created_at <= ? ORDER BY id LIMIT ?",
+                (time.time() - older_than, limit),
+            ).fetchall()
+        return [(i, tasks_v2.CreateTaskRequest.deserialize(r), t) for (i, r, t) in rows]
+
+
+class OutboxRelay:
+    """
+    Sends requests left in an outbox. Call `drain` periodically or `start` a background thread.
+
+    `min_age` keeps the relay away from rows that are still being sent by a collector.
+    """
+
+    def __init__(
+        self,
+        *,
+        outbox: SQLiteOutbox,
+        client: tasks_v2.CloudTasksClient,
+        batch_size: int = 100,
+        min_age: float = 30.0,
+        interval: float = 5.0,
+    ) -> None:
+        self.outbox = outbox
+        self.client = client
+        self.batch_size = batch_size
+        self.min_age = min_age
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def drain(self) -> int:
+        """
+        Send everything that is old enough. Returns the number of tasks sent.
+        """
+        sent = 0
+        while True:
+            rows = self.outbox.pending(limit=self.batch_size, older_than=self.min_age)
+            done = []
+            for (row_id, request, timeout) in rows:
+                try:
+                    self.client.create_task(request=request, timeout=timeout)
+                except AlreadyExists:
+                    pass
+                except SPOOLABLE_EXCEPTIONS:
+                    logger.warning("Could not relay task from outbox", exc_info=True)
+                    # Service is probably down, try again on the next round
+                    self.outbox.remove(done)
+                    return sent + len(done)
+                except Exception:
+                    # Would never succeed and would block every row after it, drop it
+                    logger.exception("Dropping task from outbox for %s", request.parent)
+                done.append(row_id)
+            self.outbox.remove(done)
+            sent += len(done)
+            if len(rows) < self.batch_size:
+                return sent
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Outbox relay failed")
+
+
+class DelayCollector:
+    """
+    Records `.delay()` calls made while handling a request and sends them together after the response.
+    """
+
+    def __init__(self, *, outbox: SQLiteOutbox = None, max_workers: int = 16) -> None:
+        self.outbox = outbox
+        self.max_workers = max_workers
+        self.flushed = False
+        self._lock = threading.Lock()
+        self._pending = []
+
+    def record(self, delayer, request: tasks_v2.CreateTaskRequest) -> bool:
+        """
+        Returns False if the request should be sent right away (collector already flushed).
+        """
+        with self._lock:
+            if self.flushed:
+                return False
+            row_id = None
+            if self.outbox is not None:
+                # Durable before the response goes out, a crash after it doesn't lose the task
+                (row_id,) = self.outbox.put([(request, delayer.task_create_timeout)])
+            self._pending.append((delayer, request, row_id))
+            return True
+
+    def discard(self):
+        """
+        Drop everything recorded so far (the request failed).
+        """
+        with self._lock:
+            self.flushed = True
+            pending, self._pending = self._pending, []
+        if self.outbox is not None:
+            self.outbox.remove([row_id for (_, _, row_id) in pending])
+
+    def flush(self):
+        with self._lock:
+            self.flushed = True
+            pending, self._pending = self._pending, []
+        if len(pending) == 0:
+            return
+
+        ids = [row_id for (_, _, row_id) in pending]
+        workers = min(self.max_workers, len(pending))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(d._create, r) for (d, r, _) in pending]
+        errors = []
+        done = []
+        for (row_id, future) in zip(ids, futures):
+            ex = future.exception()
+            if ex is None:
+                done.append(row_id)
+            else:
+                errors.append(ex)
+
+        if self.outbox is not None:
+            self.outbox.remove(done)
+            if errors:
+                logger.warning(
+                    "%d deferred tasks left in outbox: %r", len(errors), errors[0]
+                )
+            return
+        if errors:
+            raise errors[0]
+
+
+def deferred_delays(*, outbox: SQLiteOutbox = None, max_workers: int = 16):
+    """
+    Dependency that defers `.delay()` calls made during the request until the response has been sent.
+
+    Deferred calls return None. Nothing is sent if the request fails.
+    """
+
+    async def collector_dep(
+        background_tasks: BackgroundTasks,
+    ) -> AsyncIterator[DelayCollector]:
+        # Async so that the context var is set on the request's context and not on a worker thread
+        collector = DelayCollector(outbox=outbox, max_workers=max_workers)
+        _current_collector.set(collector)
+        background_tasks.add_task(collector.flush)
+        try:
+            yield collector
+        except Exception:
+            # Rows already written to the outbox must not be relayed
+            collector.discard()
+            raise
+        # BackgroundTasks aren't run when the endpoint returns a Response with its own background.
+        # This runs after the response was sent too (after background tasks), and does nothing if
+        # the background flush already ran.
+        await run_in_threadpool(collector.flush)
+
+    return collector_dep
@@ -1,16 +1,33 @@
 # Standard Library Imports
+import asyncio
 import queue
 from typing import Callable
+from typing import Union
 
 # Third Party Imports
+from fastapi import HTTPException
+from fastapi import Request
+from fastapi import Response
 from fastapi.routing import APIRoute
-from google.cloud import tasks_v2
+from starlette.concurrency import run_in_threadpool
 
 # Imports from this repository
+from fastapi_cloud_tasks.circuit_breaker import CircuitBreaker
+from fastapi_cloud_tasks.clients import tasks_client
+from fastapi_cloud_tasks.decorators import WORKER_OPTIONS
 from fastapi_cloud_tasks.delayer import Delayer
+from fastapi_cloud_tasks.durations import DurationTracker
+from fastapi_cloud_tasks.executor import DelayExecutor
 from fastapi_cloud_tasks.hooks import DelayedTaskHook
 from fastapi_cloud_tasks.hooks import noop_hook
+from fastapi_cloud_tasks.profiler import TaskProfiler
+from fastapi_cloud_tasks.spool import Spool
 from fastapi_cloud_tasks.utils import ensure_queue
+from fastapi_cloud_tasks.workflow import MemoryGroupStore
+from fastapi_cloud_tasks.workflow import Signature
+from fastapi_cloud_tasks.workflow import enqueue_follow_ups
+from fastapi_cloud_tasks.workflow import has_follow_ups
+from fastapi_cloud_tasks.workflow import verify_follow_ups
 
 
 def DelayedRouteBuilder(
@@ -21,11 +38,18 @@ def DelayedRouteBuilder(
     pre_create_hook: DelayedTaskHook = None,
     client=None,
     auto_create_queue=True,
+    group_store=None,
+    executor: DelayExecutor = None,
+    spool: Spool = None,
+    circuit_breaker: CircuitBreaker = None,
+    profiler: TaskProfiler = None,
+    duration_tracker: DurationTracker = None,
+    workflow_key: Union[str, bytes] = None,
 ):
     """
     Returns a Mixin that should be used to override route_class.
 
-    It adds a .delay and .options methods to the original endpoint.
+    It adds .delay, .delay_async, .options, .debounce and .signature methods to the original endpoint.
 
     Example:
     ```
@@ -46,20 +70,71 @@ def DelayedRouteBuilder(
     ```
     """
     if client is None:
-        client = tasks_v2.CloudTasksClient()
+        client = tasks_client()
 
     if pre_create_hook is None:
         pre_create_hook = noop_hook
 
+    if executor is None:
+        executor = DelayExecutor()
+
+    if group_store is None:
+        group_store = MemoryGroupStore()
+
     if auto_create_queue:
         ensure_queue(client=client, path=queue_path)
 
     class TaskRouteMixin(APIRoute):
+        # Shared by all routes of this builder, exposed for monitoring (`.executor.stats()`)
+        executor: DelayExecutor = None
+
         def get_route_handler(self) -> Callable:
             original_route_handler = super().get_route_handler()
             self.endpoint.options = self.delayOptions
             self.endpoint.delay = self.delay
-            return original_route_handler
+            self.endpoint.delay_async = self.delay_async
+            self.endpoint.debounce = self.debounce
+            self.endpoint.signature = self.signature
+
+            # Timed before profiling so that sampled runs aren't slower
+            if duration_tracker is not None:
+                original_route_handler = duration_tracker.wrap(
+                    original_route_handler, route=self
+                )
+
+            # Worker side option, can be set per task with task_default_options(profiler=...)
+            route_profiler = getattr(self.endpoint, "_delayOptions", {}).get(
+                "profiler", profiler
+            )
+            if route_profiler is not None:
+                original_route_handler = route_profiler.wrap(
+                    original_route_handler, route=self
+                )
+
+            async def route_handler(request: Request) -> Response:
+                # Follow ups are sent with our credentials, only run them for whoever has the key
+                if has_follow_ups(request.headers) and not verify_follow_ups(
+                    request.headers, key=workflow_key
+                ):
+                    raise HTTPException(
+                        status_code=403, detail="Invalid workflow signature"
+                    )
+                response = await original_route_handler(request)
+                # Chains and chords continue only after the current task succeeded
+                if 200 <= response.status_code < 300 and has_follow_ups(
+                    request.headers
+                ):
+                    await run_in_threadpool(
+                        enqueue_follow_ups,
+                        headers=request.headers,
+                        client=client,
+                        group_store=group_store,
+                        key=workflow_key,
+                        timeout=task_create_timeout,
+                    )
+                return response
+
+            return route_handler
 
         def delayOptions(self, **options) -> Delayer:
             delayOpts = dict(
@@ -68,9 +143,19 @@ def DelayedRouteBuilder(
                 task_create_timeout=task_create_timeout,
                 client=client,
                 pre_create_hook=pre_create_hook,
+                executor=executor,
+                spool=spool,
+                circuit_breaker=circuit_breaker,
+                workflow_key=workflow_key,
             )
             if hasattr(self.endpoint, "_delayOptions"):
-                delayOpts.update(self.endpoint._delayOptions)
+                delayOpts.update(
+                    {
+                        k: v
+                        for (k, v) in self.endpoint._delayOptions.items()
+                        if k not in WORKER_OPTIONS
+                    }
+                )
             delayOpts.update(options)
 
             return Delayer(
@@ -81,4 +166,17 @@ def DelayedRouteBuilder(
         def delay(self, **kwargs):
             return self.delayOptions().delay(**kwargs)
 
+        def delay_async(self, **kwargs) -> asyncio.Future:
+            return self.delayOptions().delay_async(**kwargs)
+
+        def signature(self, **kwargs) -> Signature:
+            return self.delayOptions().signature(**kwargs)
+
+        def debounce(self, *, key: str, window: int, **options) -> Delayer:
+            return self.delayOptions(
+                debounce_key=key, debounce_window=window, **options
+            )
+
+    TaskRouteMixin.executor = executor
+
     return TaskRouteMixin
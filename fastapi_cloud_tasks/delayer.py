@@ -1,15 +1,30 @@
 # Standard Library Imports
+import asyncio
 import datetime
+import hashlib
+import time
+from typing import Union
 
 # Third Party Imports
 from fastapi.routing import APIRoute
+from google.api_core.exceptions import AlreadyExists
 from google.cloud import tasks_v2
 from google.protobuf import timestamp_pb2
 
 # Imports from this repository
+from fastapi_cloud_tasks.circuit_breaker import CircuitBreaker
+from fastapi_cloud_tasks.deferred import current_collector
 from fastapi_cloud_tasks.exception import BadMethodException
+from fastapi_cloud_tasks.executor import DelayExecutor
+from fastapi_cloud_tasks.executor import default_executor
 from fastapi_cloud_tasks.hooks import DelayedTaskHook
+from fastapi_cloud_tasks.hooks import split_hook
+from fastapi_cloud_tasks.hooks import template_cache
+from fastapi_cloud_tasks.profiler import PROFILE_HEADER
 from fastapi_cloud_tasks.requester import Requester
+from fastapi_cloud_tasks.spool import SPOOLABLE_EXCEPTIONS
+from fastapi_cloud_tasks.spool import Spool
+from fastapi_cloud_tasks.workflow import Signature
 
 
 class Delayer(Requester):
@@ -24,6 +39,13 @@ class Delayer(Requester):
         task_create_timeout: float = 10.0,
         countdown: int = 0,
         task_id: str = None,
+        debounce_key: str = None,
+        debounce_window: int = None,
+        executor: DelayExecutor = None,
+        spool: Spool = None,
+        circuit_breaker: CircuitBreaker = None,
+        profile: bool = False,
+        workflow_key: Union[str, bytes] = None,
     ) -> None:
         super().__init__(route=route, base_url=base_url)
         self.queue_path = queue_path
@@ -31,41 +53,126 @@ class Delayer(Requester):
         self.task_create_timeout = task_create_timeout
 
         self.task_id = task_id
+        self.debounce_key = debounce_key
+        self.debounce_window = debounce_window
         self.method = _task_method(route.methods)
         self.client = client
         self.pre_create_hook = pre_create_hook
+        self.executor = executor or default_executor()
+        self.spool = spool
+        self.circuit_breaker = circuit_breaker
+        self.profile = profile
+        self.workflow_key = workflow_key
 
     def delay(self, **kwargs):
-        # Create http request
-        request = tasks_v2.HttpRequest()
-        request.http_method = self.method
-        request.url = self._url(values=kwargs)
-        request.headers = self._headers(values=kwargs)
+        request = self._task_request(**kwargs)
+        # Inside a request with `deferred_delays`, sending happens after the response
+        collector = current_collector()
+        if collector is not None and collector.record(self, request):
+            return None
+        return self._create(request)
+
+    def delay_async(self, **kwargs) -> asyncio.Future:
+        """
+        Same as delay, but runs on the executor's threads and returns an awaitable.
+        """
+        return self.executor.run(self.delay, **kwargs)
+
+    def signature(self, **kwargs) -> Signature:
+        """
+        Returns a Signature to be used with chain/group/chord from `fastapi_cloud_tasks.workflow`
+        """
+        return Signature(delayer=self, values=kwargs)
+
+    def _task_request(self, **kwargs) -> tasks_v2.CreateTaskRequest:
+        # Start from a copy of the route's template, static hooks have already been applied to it
+        (template, dynamic_hook) = _task_template(
+            self.queue_path, self.method, self.pre_create_hook
+        )
+        request = tasks_v2.CreateTaskRequest.wrap(_clone(template))
+        task = request.task
+
+        # Fill http request
+        http_request = task.http_request
+        http_request.url = self._url(values=kwargs)
+        # Headers set by static hooks win, same as when hooks ran after the request was built
+        http_request.headers.update(
+            {
+                k: v
+                for (k, v) in self._headers(values=kwargs).items()
+                if k not in http_request.headers
+            }
+        )
+
+        # Ask the worker's TaskProfiler to profile this task
+        if self.profile:
+            http_request.headers[PROFILE_HEADER] = "1"
 
         body = self._body(values=kwargs)
         if body:
-            request.body = body
+            http_request.body = body
+
+        # Debounced tasks all go to the same bucket, sent once the bucket's window is over
+        bucket = self._debounce_bucket()
 
         # Scheduled the task
-        task = tasks_v2.Task(http_request=request)
-        schedule_time = self._schedule()
+        schedule_time = self._schedule(bucket)
         if schedule_time:
             task.schedule_time = schedule_time
 
         # Make task name for deduplication
-        if self.task_id:
-            task.name = f"{self.queue_path}/tasks/{self.task_id}"
+        task_id = self._task_id(bucket)
+        if task_id:
+            task.name = f"{self.queue_path}/tasks/{task_id}"
 
-        request = tasks_v2.CreateTaskRequest(parent=self.queue_path, task=task)
+        return dynamic_hook(request)
 
-        request = self.pre_create_hook(request)
+    def _create(self, request: tasks_v2.CreateTaskRequest):
+        try:
+            if self.circuit_breaker is not None:
+                return self.circuit_breaker.call(
+                    self.client.create_task,
+                    request=request,
+                    timeout=self.task_create_timeout,
+                )
+            return self.client.create_task(
+                request=request, timeout=self.task_create_timeout
+            )
+        except AlreadyExists:
+            # A task for this key and window is already queued. That's the whole point of debouncing.
+            if self.debounce_key is None:
+                raise
+            return None
+        except SPOOLABLE_EXCEPTIONS:
+            if self.spool is None:
+                raise
+            # Sent later by a SpoolReplayer
+            self.spool.append(request)
+            return None
 
-        return self.client.create_task(
-            request=request, timeout=self.task_create_timeout
-        )
+    def _debounce_bucket(self):
+        if self.debounce_key is None:
+            return None
+        if not self.debounce_window or self.debounce_window <= 0:
+            raise ValueError("debounce_window must be a positive number of seconds")
+        return int(time.time() // self.debounce_window)
+
+    def _task_id(self, bucket: int = None):
+        if bucket is None:
+            return self.task_id
+        # Hashing keeps the id within the allowed charset ([A-Za-z0-9_-]).
+        # It also spreads names out which Cloud Tasks prefers over sequential ids.
+        key = f"{self.route.unique_id}/{self.debounce_key}/{self.debounce_window}/{bucket}"
+        return hashlib.sha256(key.encode()).hexdigest()
 
-    def _schedule(self):
-        if self.countdown is None or self.countdown <= 0:
+    def _schedule(self, bucket: int = None):
+        countdown = self.countdown if self.countdown and self.countdown > 0 else 0
+        if bucket is not None:
+            # Runs after the window ends, not when the first call of the window happens
+            return timestamp_pb2.Timestamp(
+                seconds=int((bucket + 1) * self.debounce_window + countdown)
+            )
+        if countdown <= 0:
             return None
         d = datetime.datetime.utcnow() + datetime.timedelta(seconds=self.countdown)
         timestamp = timestamp_pb2.Timestamp()
@@ -73,6 +180,24 @@ class Delayer(Requester):
         return timestamp
 
 
+@template_cache
+def _task_template(queue_path: str, method, pre_create_hook: DelayedTaskHook):
+    (static_hooks, dynamic_hook) = split_hook(pre_create_hook)
+    request = tasks_v2.CreateTaskRequest(
+        parent=queue_path,
+        task=tasks_v2.Task(http_request=tasks_v2.HttpRequest(http_method=method)),
+    )
+    for hook in static_hooks:
+        request = hook(request)
+    return tasks_v2.CreateTaskRequest.pb(request), dynamic_hook
+
+
+def _clone(pb):
+    copy = type(pb)()
+    copy.CopyFrom(pb)
+    return copy
+
+
 def _task_method(methods):
     methodMap = {
         "POST": tasks_v2.HttpMethod.POST,
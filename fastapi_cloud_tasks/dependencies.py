@@ -1,11 +1,13 @@
 # Standard Library Imports
-import typing
 from datetime import datetime
 
 # Third Party Imports
 from fastapi import Depends
-from fastapi import Header
 from fastapi import HTTPException
+from fastapi import Request
+
+# Key on request.state
+STATE_KEY = "cloud_tasks_headers"
 
 
 def max_retries(count: int = 20):
@@ -13,7 +15,7 @@ def max_retries(count: int = 20):
     Raises a http exception (with status 200) after max retries are exhausted
     """
 
-    def retries_dep(meta: CloudTasksHeaders = Depends()) -> bool:
+    def retries_dep(meta: CloudTasksHeaders = Depends(cloud_tasks_headers)) -> bool:
         # count starts from 0 so equality check is required
         if meta.retry_count >= count:
             raise HTTPException(status_code=200, detail="Max retries exhausted")
@@ -21,27 +23,82 @@ def max_retries(count: int = 20):
     return retries_dep
 
 
+# header name -> (attribute, converter, default)
+_HEADERS = {
+    b"x-cloudtasks-taskretrycount": ("retry_count", int, 0),
+    b"x-cloudtasks-taskexecutioncount": ("execution_count", int, 0),
+    b"x-cloudtasks-queuename": ("queue_name", str, ""),
+    b"x-cloudtasks-taskname": ("task_name", str, ""),
+    b"x-cloudtasks-tasketa": ("eta", float, 0),
+    b"x-cloudtasks-taskpreviousresponse": ("previous_response", int, 0),
+    b"x-cloudtasks-taskretryreason": ("retry_reason", str, ""),
+}
+
+
 class CloudTasksHeaders:
     """
     Extracts known headers sent by Cloud Tasks
 
     Full list: https://cloud.google.com/tasks/docs/creating-http-target-tasks#handler
+
+    Headers are parsed once per request (or by `CloudTasksHeadersMiddleware`) and cached on `request.state`.
     """
 
-    def __init__(
-        self,
-        x_cloudtasks_taskretrycount: typing.Optional[int] = Header(0),
-        x_cloudtasks_taskexecutioncount: typing.Optional[int] = Header(0),
-        x_cloudtasks_queuename: typing.Optional[str] = Header(""),
-        x_cloudtasks_taskname: typing.Optional[str] = Header(""),
-        x_cloudtasks_tasketa: typing.Optional[float] = Header(0),
-        x_cloudtasks_taskpreviousresponse: typing.Optional[int] = Header(0),
-        x_cloudtasks_taskretryreason: typing.Optional[str] = Header(""),
-    ) -> None:
-        self.retry_count = x_cloudtasks_taskretrycount
-        self.execution_count = x_cloudtasks_taskexecutioncount
-        self.queue_name = x_cloudtasks_queuename
-        self.task_name = x_cloudtasks_taskname
-        self.eta = datetime.fromtimestamp(x_cloudtasks_tasketa)
-        self.previous_response = x_cloudtasks_taskpreviousresponse
-        self.retry_reason = x_cloudtasks_taskretryreason
+    __slots__ = tuple(attr for (attr, _, _) in _HEADERS.values())
+
+    def __init__(self, request: Request) -> None:
+        cached = cloud_tasks_headers(request)
+        for name in self.__slots__:
+            setattr(self, name, getattr(cached, name))
+
+    @classmethod
+    def from_scope(cls, scope) -> "CloudTasksHeaders":
+        headers = cls.__new__(cls)
+        for (attr, _, default) in _HEADERS.values():
+            setattr(headers, attr, default)
+        # Single pass over raw ASGI headers, names are already lower case bytes
+        for (name, value) in scope["headers"]:
+            known = _HEADERS.get(name)
+            if known is None:
+                continue
+            (attr, converter, _) = known
+            try:
+                setattr(headers, attr, converter(value.decode("latin-1")))
+            except ValueError:
+                # Keep the default, failing here would make Cloud Tasks retry forever
+                pass
+        try:
+            headers.eta = datetime.fromtimestamp(headers.eta)
+        except (ValueError, OverflowError, OSError):
+            # nan or out of range, same reason as above
+            headers.eta = datetime.fromtimestamp(0)
+        return headers
+
+
+def cloud_tasks_headers(request: Request) -> CloudTasksHeaders:
+    """
+    Dependency returning the cached `CloudTasksHeaders` of the request.
+    """
+    state = request.scope.setdefault("state", {})
+    headers = state.get(STATE_KEY)
+    if headers is None:
+        headers = state[STATE_KEY] = CloudTasksHeaders.from_scope(request.scope)
+    return headers
+
+
+class CloudTasksHeadersMiddleware:
+    """
+    ASGI middleware that parses Cloud Tasks headers once per request into `request.state.cloud_tasks_headers`.
+
+    Usage: `app.add_middleware(CloudTasksHeadersMiddleware)`
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            scope.setdefault("state", {})[STATE_KEY] = CloudTasksHeaders.from_scope(
+                scope
+            )
+        await self.app(scope, receive, send)
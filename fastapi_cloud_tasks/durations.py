@@ -0,0 +1,126 @@
+# Standard Library Imports
+import bisect
+import re
+import threading
+import time
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Optional
+from urllib.parse import urlparse
+
+# Third Party Imports
+from fastapi import Request
+from fastapi import Response
+from fastapi.routing import APIRoute
+
+# Bucket upper bounds in seconds: 10ms to ~1.5 hours, 25% apart
+_BOUNDS: List[float] = []
+_b = 0.01
+while _b < 5400:
+    _BOUNDS.append(_b)
+    _b *= 1.25
+del _b
+
+
+class _Histogram:
+    def __init__(self, pattern: "re.Pattern") -> None:
+        self.pattern = pattern
+        self.counts = [0] * (len(_BOUNDS) + 1)
+        self.total = 0
+
+
+class DurationTracker:
+    """
+    Keeps a histogram of handler durations per route.
+
+    Durations are reported by the worker (see `wrap`, used by `DelayedRouteBuilder(duration_tracker=...)`)
+    and read by the adaptive deadline hooks, matching the task URL against the routes seen so far.
+    Counts are halved after `max_samples` so that the histogram follows changes in the handler.
+    """
+
+    def __init__(self, *, min_samples: int = 20, max_samples: int = 10_000) -> None:
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _Histogram] = {}
+        # url path -> route key, most task URLs repeat
+        self._url_keys: Dict[str, Optional[str]] = {}
+
+    def observe(self, *, key: str, path_regex: "re.Pattern", seconds: float):
+        """
+        `key` identifies the route, `path_regex` matches the paths it serves (relative to the app).
+        """
+        with self._lock:
+            hist = self._routes.get(key)
+            if hist is None:
+                # Anchored at the end only, the task URL has the base url's path in front
+                hist = self._routes[key] = _Histogram(
+                    re.compile(path_regex.pattern.lstrip("^"))
+                )
+                self._url_keys.clear()
+            hist.counts[bisect.bisect_left(_BOUNDS, seconds)] += 1
+            hist.total += 1
+            if hist.total >= self.max_samples:
+                hist.counts = [c // 2 for c in hist.counts]
+                hist.total = sum(hist.counts)
+
+    def wrap(
+        self, route_handler: Callable[[Request], Awaitable[Response]], route: APIRoute
+    ):
+        """
+        Wraps the handler returned by `route.get_route_handler()` to observe its durations.
+
+        Only the handler is timed, sending the response and background tasks run after it returns.
+        """
+        key = route.unique_id
+        path_regex = route.path_regex
+
+        async def timed_handler(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                return await route_handler(request)
+            finally:
+                self.observe(
+                    key=key, path_regex=path_regex, seconds=time.perf_counter() - start
+                )
+
+        return timed_handler
+
+    def percentile(self, key: str, p: float) -> Optional[float]:
+        """
+        Upper bound (seconds) of the bucket holding the p-th percentile, None until min_samples were seen.
+        """
+        with self._lock:
+            hist = self._routes.get(key)
+            if hist is None or hist.total < self.min_samples:
+                return None
+            threshold = p * hist.total
+            seen = 0
+            for (i, count) in enumerate(hist.counts):
+                seen += count
+                if seen >= threshold:
+                    return _BOUNDS[i] if i < len(_BOUNDS) else _BOUNDS[-1] * 1.25
+        return None
+
+    def percentile_for_url(self, url: str, p: float) -> Optional[float]:
+        key = self.key_for_url(url)
+        if key is None:
+            return None
+        return self.percentile(key, p)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        path = urlparse(url).path
+        with self._lock:
+            if path in self._url_keys:
+                return self._url_keys[path]
+            key = None
+            for (k, hist) in self._routes.items():
+                if hist.pattern.search(path):
+                    key = k
+                    break
+            if len(self._url_keys) > 10_000:
+                self._url_keys.clear()
+            self._url_keys[path] = key
+            return key
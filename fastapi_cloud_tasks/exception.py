@@ -13,3 +13,15 @@ class WrongTypeError(PydanticValueError):
 
 class BadMethodException(Exception):
     pass
+
+
+class ExecutorFullException(Exception):
+    pass
+
+
+class CircuitOpenException(Exception):
+    pass
+
+
+class WorkflowKeyException(Exception):
+    pass
@@ -0,0 +1,87 @@
+# Standard Library Imports
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+
+# Imports from this repository
+from fastapi_cloud_tasks.exception import ExecutorFullException
+
+
+class DelayExecutor:
+    """
+    Bounded thread pool for blocking enqueue calls (`Delayer.delay`, `Scheduler.schedule`) made from async code.
+
+    It is separate from the threadpool FastAPI uses for sync endpoints, so slow enqueue RPCs can't starve them.
+    Submitting more than `max_queue` waiting calls raises `ExecutorFullException`.
+    """
+
+    def __init__(self, *, max_workers: int = 4, max_queue: int = 1000) -> None:
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fastapi-cloud-tasks"
+        )
+        self._lock = threading.Lock()
+        self._active = 0
+        self._queued = 0
+        self._completed = 0
+        self._rejected = 0
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        with self._lock:
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                self._rejected += 1
+                raise ExecutorFullException(
+                    f"{self._queued} calls already waiting for a thread"
+                )
+            self._queued += 1
+        # Keep context vars (eg: deferred_delays) of the caller
+        context = contextvars.copy_context()
+        return self._pool.submit(context.run, self._run, fn, args, kwargs)
+
+    def run(self, fn, *args, **kwargs) -> asyncio.Future:
+        """
+        Same as submit, but returns an awaitable.
+        """
+        return asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(
+                max_workers=self.max_workers,
+                active=self._active,
+                queued=self._queued,
+                completed=self._completed,
+                rejected=self._rejected,
+                # Over 1 means calls are waiting for a thread
+                saturation=(self._active + self._queued) / self.max_workers,
+            )
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def _run(self, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            self._active += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._completed += 1
+
+
+_default = None
+_default_lock = threading.Lock()
+
+
+def default_executor() -> DelayExecutor:
+    global _default
+    if _default is None:
+        with _default_lock:
+            if _default is None:
+                _default = DelayExecutor()
+    return _default
@@ -1,4 +1,6 @@
 # Standard Library Imports
+import functools
+import math
 from typing import Callable
 
 # Third Party Imports
@@ -6,10 +8,75 @@ from google.cloud import scheduler_v1
 from google.cloud import tasks_v2
 from google.protobuf import duration_pb2
 
+# Imports from this repository
+from fastapi_cloud_tasks.durations import DurationTracker
+
 DelayedTaskHook = Callable[[tasks_v2.CreateTaskRequest], tasks_v2.CreateTaskRequest]
 ScheduledHook = Callable[[scheduler_v1.CreateJobRequest], scheduler_v1.CreateJobRequest]
 
 
+def static_hook(hook):
+    """
+    Marks a hook that sets the same fields on every request (eg: tokens, deadlines)
+
+    Static hooks at the start of a chain are applied once per route to a template request,
+    which is then copied for every task/job instead of running the hooks again.
+    """
+    hook.static = True
+    return hook
+
+
+def is_static(hook) -> bool:
+    return getattr(hook, "static", False)
+
+
+def split_hook(hook):
+    """
+    Splits a hook into the leading static hooks and a hook running the rest
+
+    Only the leading static hooks can be moved to a template, anything after a dynamic hook
+    might depend on what that hook did.
+    """
+    hooks = _flatten(hook)
+    i = 0
+    while i < len(hooks) and is_static(hooks[i]):
+        i += 1
+    rest = hooks[i:]
+    if len(rest) == 0:
+        return hooks, noop_hook
+    if len(rest) == 1:
+        return hooks[:i], rest[0]
+    return hooks[:i], chained_hook(*rest)
+
+
+def template_cache(build):
+    """
+    Caches templates by their arguments (which include the hook)
+
+    Unhashable hooks (eg: a dataclass instance with `__call__`) can't be cache keys,
+    for those the template is built on every call.
+    """
+    cached = functools.lru_cache(maxsize=1024)(build)
+
+    @functools.wraps(build)
+    def template(*args):
+        try:
+            hash(args)
+        except TypeError:
+            return build(*args)
+        return cached(*args)
+
+    template.cache_clear = cached.cache_clear
+    return template
+
+
+def _flatten(hook):
+    if hasattr(hook, "hooks"):
+        return [h for inner in hook.hooks for h in _flatten(inner)]
+    return [hook]
+
+
+@static_hook
 def noop_hook(request):
     """
     Inspired by https://github.com/kelseyhightower/nocode
@@ -27,6 +94,8 @@ def chained_hook(*hooks):
             request = hook(request)
         return request
 
+    chain.hooks = hooks
+    chain.static = all(is_static(hook) for hook in hooks)
     return chain
 
 
@@ -43,7 +112,7 @@ def oidc_scheduled_hook(token: scheduler_v1.OidcToken) -> ScheduledHook:
         request.job.http_target.oidc_token = token
         return request
 
-    return add_token
+    return static_hook(add_token)
 
 
 def oidc_delayed_hook(token: tasks_v2.OidcToken) -> DelayedTaskHook:
@@ -57,7 +126,7 @@ def oidc_delayed_hook(token: tasks_v2.OidcToken) -> DelayedTaskHook:
         request.task.http_request.oidc_token = token
         return request
 
-    return add_token
+    return static_hook(add_token)
 
 
 def oauth_scheduled_hook(token: scheduler_v1.OAuthToken) -> ScheduledHook:
@@ -73,7 +142,7 @@ def oauth_scheduled_hook(token: scheduler_v1.OAuthToken) -> ScheduledHook:
         request.job.http_target.oauth_token = token
         return request
 
-    return add_token
+    return static_hook(add_token)
 
 
 def oauth_delayed_hook(token: tasks_v2.OAuthToken) -> DelayedTaskHook:
@@ -87,7 +156,7 @@ def oauth_delayed_hook(token: tasks_v2.OAuthToken) -> DelayedTaskHook:
         request.task.http_request.oauth_token = token
         return request
 
-    return add_token
+    return static_hook(add_token)
 
 
 def deadline_scheduled_hook(duration: duration_pb2.Duration) -> ScheduledHook:
@@ -103,7 +172,7 @@ def deadline_scheduled_hook(duration: duration_pb2.Duration) -> ScheduledHook:
         request.job.attempt_deadline = duration
         return request
 
-    return deadline
+    return static_hook(deadline)
 
 
 def deadline_delayed_hook(duration: duration_pb2.Duration) -> DelayedTaskHook:
@@ -117,4 +186,75 @@ def deadline_delayed_hook(duration: duration_pb2.Duration) -> DelayedTaskHook:
         request.task.dispatch_deadline = duration
         return request
 
+    return static_hook(deadline)
+
+
+def adaptive_deadline_scheduled_hook(
+    tracker: DurationTracker,
+    *,
+    percentile: float = 0.99,
+    headroom: float = 1.5,
+    min_deadline: float = 15,
+    max_deadline: float = 1800,
+) -> ScheduledHook:
+    """
+    Returns a hook for ScheduledRouteBuilder to set Deadline for job execution from observed handler durations
+
+    Deadline is `percentile` of the route's durations times `headroom`, clamped to [min_deadline, max_deadline].
+    Until the tracker has enough samples the request is left as is, so chain it after `deadline_scheduled_hook` for a default.
+    """
+
+    def deadline(
+        request: scheduler_v1.CreateJobRequest,
+    ) -> scheduler_v1.CreateJobRequest:
+        seconds = _adaptive_seconds(
+            tracker,
+            request.job.http_target.uri,
+            percentile,
+            headroom,
+            min_deadline,
+            max_deadline,
+        )
+        if seconds is not None:
+            request.job.attempt_deadline = duration_pb2.Duration(seconds=seconds)
+        return request
+
+    return deadline
+
+
+def adaptive_deadline_delayed_hook(
+    tracker: DurationTracker,
+    *,
+    percentile: float = 0.99,
+    headroom: float = 1.5,
+    min_deadline: float = 15,
+    max_deadline: float = 1800,
+) -> DelayedTaskHook:
+    """
+    Returns a hook for DelayedRouteBuilder to set Deadline for task execution from observed handler durations
+
+    Deadline is `percentile` of the route's durations times `headroom`, clamped to [min_deadline, max_deadline].
+    Until the tracker has enough samples the request is left as is, so chain it after `deadline_delayed_hook` for a default.
+    """
+
+    def deadline(request: tasks_v2.CreateTaskRequest) -> tasks_v2.CreateTaskRequest:
+        seconds = _adaptive_seconds(
+            tracker,
+            request.task.http_request.url,
+            percentile,
+            headroom,
+            min_deadline,
+            max_deadline,
+        )
+        if seconds is not None:
+            request.task.dispatch_deadline = duration_pb2.Duration(seconds=seconds)
+        return request
+
     return deadline
+
+
+def _adaptive_seconds(tracker, url, percentile, headroom, min_deadline, max_deadline):
+    observed = tracker.percentile_for_url(url, percentile)
+    if observed is None:
+        return None
+    return math.ceil(min(max(observed * headroom, min_deadline), max_deadline))
@@ -0,0 +1,271 @@
+"""
+Drives `.delay()` traffic at a fixed rate and reports enqueue latency, dispatch lag and handler throughput.
+
+Usage:
+```
+python -m fastapi_cloud_tasks.loadtest examples.simple.main:app examples.simple.main:hello \\
+    --rate 200 --duration 30 --client local --kwargs '{"p": {"message": "load"}}'
+```
+
+Clients:
+- fake: tasks are accepted and dropped. Measures the cost of building requests only.
+- local: tasks are dispatched back to the app in process. Measures the whole pipeline without a network.
+- emulator: tasks are sent to cloud-tasks-emulator, which dispatches them to wherever the app is served.
+  Only enqueue latency is measured.
+
+Note: the route's builder still runs with its own settings on import (eg: `auto_create_queue`).
+"""
+# Standard Library Imports
+import argparse
+import asyncio
+import importlib
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# Third Party Imports
+from google.cloud import tasks_v2
+
+# Imports from this repository
+from fastapi_cloud_tasks.asgi import call_asgi
+from fastapi_cloud_tasks.utils import emulator_client
+
+
+class FakeTasksClient:
+    """
+    Accepts every task and drops it.
+    """
+
+    def __init__(self) -> None:
+        self.created = 0
+
+    def create_task(
+        self, request: tasks_v2.CreateTaskRequest, timeout: float = None, **ignored
+    ):
+        self.created += 1
+        return request.task
+
+
+class LocalTasksClient(FakeTasksClient):
+    """
+    Accepts every task and queues it for in-process dispatch.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, queue: asyncio.Queue) -> None:
+        super().__init__()
+        self.loop = loop
+        self.queue = queue
+
+    def create_task(
+        self, request: tasks_v2.CreateTaskRequest, timeout: float = None, **ignored
+    ):
+        task = super().create_task(request, timeout)
+        # create_task is called from worker threads
+        self.loop.call_soon_threadsafe(
+            self.queue.put_nowait, (time.perf_counter(), self.created, task)
+        )
+        return task
+
+
+class Stats:
+    def __init__(self) -> None:
+        self.enqueue_latency: List[float] = []
+        self.enqueue_errors = 0
+        self.dispatch_lag: List[float] = []
+        self.handler_duration: List[float] = []
+        self.handler_errors = 0
+        self.first_dispatch = None
+        self.last_dispatch = None
+
+
+async def dispatch(app, queue: asyncio.Queue, stats: Stats):
+    while True:
+        (enqueued, number, task) = await queue.get()
+        start = time.perf_counter()
+        stats.dispatch_lag.append(start - enqueued)
+        if stats.first_dispatch is None:
+            stats.first_dispatch = start
+        request = task.http_request
+        headers = dict(request.headers)
+        headers["X-CloudTasks-TaskName"] = str(number)
+        headers["X-CloudTasks-QueueName"] = "loadtest"
+        headers["X-CloudTasks-TaskETA"] = str(time.time())
+        try:
+            status = await call_asgi(
+                app,
+                method=tasks_v2.HttpMethod(request.http_method).name,
+                url=request.url,
+                headers=headers,
+                body=request.body,
+            )
+        except Exception:
+            status = 500
+        if not 200 <= status < 300:
+            stats.handler_errors += 1
+        stats.last_dispatch = time.perf_counter()
+        stats.handler_duration.append(stats.last_dispatch - start)
+        queue.task_done()
+
+
+def enqueue(delayer, kwargs, stats: Stats):
+    start = time.perf_counter()
+    try:
+        delayer.delay(**kwargs)
+    except Exception:
+        stats.enqueue_errors += 1
+        return
+    stats.enqueue_latency.append(time.perf_counter() - start)
+
+
+async def run(
+    *,
+    app,
+    endpoint,
+    kwargs,
+    client_name,
+    rate,
+    duration,
+    workers,
+    concurrency,
+    emulator_host,
+):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    stats = Stats()
+
+    if client_name == "fake":
+        client = FakeTasksClient()
+    elif client_name == "local":
+        client = LocalTasksClient(loop, queue)
+    else:
+        client = emulator_client(host=emulator_host)
+    delayer = endpoint.options(client=client)
+
+    dispatchers = []
+    if client_name == "local":
+        dispatchers = [
+            asyncio.create_task(dispatch(app, queue, stats)) for _ in range(concurrency)
+        ]
+
+    total = int(rate * duration)
+    pending = []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for i in range(total):
+            # Fixed schedule, so a slow enqueue doesn't lower the offered rate
+            wait = start + i / rate - time.perf_counter()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            pending.append(loop.run_in_executor(pool, enqueue, delayer, kwargs, stats))
+        await asyncio.gather(*pending)
+    enqueue_elapsed = time.perf_counter() - start
+
+    if dispatchers:
+        await queue.join()
+        for d in dispatchers:
+            d.cancel()
+
+    return report(stats, total=total, elapsed=enqueue_elapsed)
+
+
+def percentiles(values: List[float]) -> str:
+    if not values:
+        return "n/a"
+    values = sorted(values)
+
+    def at(p):
+        return values[min(len(values) - 1, int(p * len(values)))] * 1000
+
+    return f"p50={at(0.5):.2f}ms p90={at(0.9):.2f}ms p99={at(0.99):.2f}ms max={values[-1] * 1000:.2f}ms"
+
+
+def report(stats: Stats, *, total: int, elapsed: float) -> str:
+    lines = [
+        f"offered:          {total} tasks in {elapsed:.2f}s ({total / elapsed:.1f}/s)",
+        f"enqueued:         {len(stats.enqueue_latency)} ok, {stats.enqueue_errors} errors",
+        f"enqueue latency:  {percentiles(stats.enqueue_latency)}",
+    ]
+    if stats.first_dispatch is not None:
+        window = max(stats.last_dispatch - stats.first_dispatch, 1e-9)
+        handled = len(stats.handler_duration)
+        lines += [
+            f"dispatched:       {handled} ({stats.handler_errors} non 2xx)",
+            f"dispatch lag:     {percentiles(stats.dispatch_lag)}",
+            f"handler duration: {percentiles(stats.handler_duration)}",
+            f"throughput:       {handled / window:.1f} tasks/s",
+        ]
+    return "\n".join(lines)
+
+
+def load(path: str):
+    (module, _, attr) = path.partition(":")
+    if not attr:
+        raise ValueError(f"Expected module:attribute, got {path!r}")
+    obj = importlib.import_module(module)
+    for part in attr.split("."):
+        obj = getattr(obj, part)
+    return obj
+
+
+def route_kwargs(endpoint, raw: dict) -> dict:
+    # Body params need their model, not a dict (Requester checks the type)
+    route = endpoint.options().route
+    body_field = route.body_field
+    if body_field and body_field.name and isinstance(raw.get(body_field.name), dict):
+        raw = dict(raw)
+        raw[body_field.name] = body_field.type_(**raw[body_field.name])
+    return raw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m fastapi_cloud_tasks.loadtest",
+        description=__doc__.split("\n")[1],
+    )
+    parser.add_argument("app", help="ASGI app serving the route, as module:attribute")
+    parser.add_argument("route", help="Delayed endpoint, as module:attribute")
+    parser.add_argument("--kwargs", default="{}", help="JSON object passed to .delay()")
+    parser.add_argument(
+        "--client", choices=["fake", "local", "emulator"], default="local"
+    )
+    parser.add_argument(
+        "--rate", type=float, default=100, help="Tasks per second to offer"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10, help="Seconds to generate traffic for"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=16, help="Threads calling .delay()"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=16, help="Concurrent local dispatches"
+    )
+    parser.add_argument("--emulator-host", default="localhost:8123")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, "")
+    app = load(args.app)
+    endpoint = load(args.route)
+    kwargs = route_kwargs(endpoint, json.loads(args.kwargs))
+
+    print(
+        asyncio.run(
+            run(
+                app=app,
+                endpoint=endpoint,
+                kwargs=kwargs,
+                client_name=args.client,
+                rate=args.rate,
+                duration=args.duration,
+                workers=args.workers,
+                concurrency=args.concurrency,
+                emulator_host=args.emulator_host,
+            )
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+# Standard Library Imports
+import asyncio
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from datetime import timezone
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+# Third Party Imports
+from google.api_core.exceptions import AlreadyExists
+from google.api_core.exceptions import InvalidArgument
+from google.api_core.exceptions import NotFound
+from google.cloud import scheduler_v1
+
+# Imports from this repository
+from fastapi_cloud_tasks.asgi import call_asgi
+from fastapi_cloud_tasks.cron import CronSchedule
+
+logger = logging.getLogger(__name__)
+
+
+class Firing(NamedTuple):
+    job_name: str
+    schedule_time: float
+    attempt: int
+    status: int
+
+
+class _Entry:
+    def __init__(
+        self, job: scheduler_v1.Job, cron: CronSchedule, generation: int
+    ) -> None:
+        self.job = job
+        self.cron = cron
+        self.generation = generation
+
+
+class LocalSchedulerClient:
+    """
+    In-process stand-in for `CloudSchedulerClient`. Pass it as `client` to `ScheduledRouteBuilder`.
+
+    Jobs are kept in memory and fire against the ASGI `app` (no network).
+    Next fire times are kept in a heap so only due jobs are looked at, no matter how many jobs exist.
+
+    Time is virtual: `advance(seconds)` fires everything due in that window immediately (for tests)
+    and `serve(speed=...)` follows the wall clock, optionally sped up.
+    """
+
+    job_path = staticmethod(scheduler_v1.CloudSchedulerClient.job_path)
+    parse_job_path = staticmethod(scheduler_v1.CloudSchedulerClient.parse_job_path)
+    common_location_path = staticmethod(
+        scheduler_v1.CloudSchedulerClient.common_location_path
+    )
+    parse_common_location_path = staticmethod(
+        scheduler_v1.CloudSchedulerClient.parse_common_location_path
+    )
+
+    def __init__(self, app, *, start: float = None, history_size: int = 10_000) -> None:
+        self.app = app
+        self.now = time.time() if start is None else start
+        self.history = deque(maxlen=history_size)
+        # Jobs are created from sync code (Scheduler.schedule) while firing happens on the event loop
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, _Entry] = {}
+        # (fire time, tie breaker, job name, generation, attempt, schedule time)
+        self._heap = []
+        self._seq = itertools.count()
+        self._generations = itertools.count()
+
+    # CloudSchedulerClient API
+
+    def create_job(
+        self,
+        request: scheduler_v1.CreateJobRequest = None,
+        *,
+        parent=None,
+        job=None,
+        **ignored,
+    ):
+        if request is None:
+            request = scheduler_v1.CreateJobRequest(parent=parent, job=job)
+        job = _copy(request.job)
+        try:
+            cron = CronSchedule(job.schedule, job.time_zone)
+        except Exception as ex:
+            raise InvalidArgument(f"Invalid schedule {job.schedule!r}: {ex}")
+        job.state = scheduler_v1.Job.State.ENABLED
+        job.user_update_time = _timestamp(self.now)
+        with self._lock:
+            if job.name in self._jobs:
+                raise AlreadyExists(f"Job {job.name} already exists")
+            entry = self._jobs[job.name] = _Entry(job, cron, next(self._generations))
+            self._push_next(entry, self.now)
+        return _copy(job)
+
+    def get_job(self, request=None, *, name: str = None, **ignored):
+        name = name or request.name
+        with self._lock:
+            entry = self._jobs.get(name)
+            if entry is None:
+                raise NotFound(f"Job {name} not found")
+            return _returned(entry.job)
+
+    def list_jobs(self, request=None, *, parent: str = None, **ignored):
+        parent = parent or request.parent
+        with self._lock:
+            return [
+                _returned(e.job)
+                for (name, e) in self._jobs.items()
+                if name.startswith(f"{parent}/jobs/")
+            ]
+
+    def delete_job(self, request=None, *, name: str = None, **ignored):
+        name = name or request.name
+        with self._lock:
+            # Stale heap entries are skipped when they are popped
+            if self._jobs.pop(name, None) is None:
+                raise NotFound(f"Job {name} not found")
+
+    # Running jobs
+
+    def next_fire_time(self) -> float:
+        with self._lock:
+            self._drop_stale()
+            return self._heap[0][0] if self._heap else None
+
+    async def advance(self, seconds: float) -> List[Firing]:
+        """
+        Move virtual time forward, firing every job that is due on the way in order.
+        """
+        target = self.now + seconds
+        fired = []
+        while True:
+            due = self._pop_due(target)
+            if not due:
+                break
+            self.now = max(self.now, due[0][0])
+            fired.extend(await asyncio.gather(*[self._fire(*item) for item in due]))
+        self.now = target
+        return fired
+
+    async def serve(self, *, speed: float = 1.0, max_sleep: float = 1.0):
+        """
+        Fire jobs forever, with virtual time running `speed` times faster than the wall clock.
+        """
+        last = time.monotonic()
+        while True:
+            next_fire = self.next_fire_time()
+            wait = max_sleep if next_fire is None else (next_fire - self.now) / speed
+            await asyncio.sleep(min(max(wait, 0), max_sleep))
+            current = time.monotonic()
+            await self.advance((current - last) * speed)
+            last = current
+
+    def _push_next(self, entry: _Entry, after: float):
+        # Must be called with the lock held
+        fire = entry.cron.next_after(
+            datetime.fromtimestamp(after, tz=timezone.utc)
+        ).timestamp()
+        heapq.heappush(
+            self._heap,
+            (fire, next(self._seq), entry.job.name, entry.generation, 0, fire),
+        )
+
+    def _drop_stale(self):
+        # Must be called with the lock held
+        while self._heap:
+            (_, _, name, generation, _, _) = self._heap[0]
+            entry = self._jobs.get(name)
+            if entry is not None and entry.generation == generation:
+                return
+            heapq.heappop(self._heap)
+
+    def _pop_due(self, until: float):
+        # Everything due at the earliest time, so that jobs at the same time fire concurrently
+        due = []
+        with self._lock:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > until:
+                return due
+            fire_time = self._heap[0][0]
+            while self._heap and self._heap[0][0] == fire_time:
+                (fire, _, name, generation, attempt, schedule_time) = heapq.heappop(
+                    self._heap
+                )
+                entry = self._jobs.get(name)
+                if entry is None or entry.generation != generation:
+                    continue
+                if attempt == 0:
+                    self._push_next(entry, fire)
+                due.append((fire, entry, attempt, schedule_time))
+        return due
+
+    async def _fire(
+        self, fire: float, entry: _Entry, attempt: int, schedule_time: float
+    ) -> Firing:
+        job = entry.job
+        target = job.http_target
+        headers = dict(target.headers)
+        headers["User-Agent"] = "Google-Cloud-Scheduler"
+        headers["X-CloudScheduler"] = "true"
+        headers["X-CloudScheduler-JobName"] = job.name.rsplit("/", 1)[-1]
+        headers["X-CloudScheduler-ScheduleTime"] = _rfc3339(schedule_time)
+        try:
+            status = await call_asgi(
+                self.app,
+                method=scheduler_v1.HttpMethod(target.http_method).name,
+                url=target.uri,
+                headers=headers,
+                body=target.body,
+            )
+        except Exception:
+            logger.exception("Job %s failed", job.name)
+            status = 500
+
+        if not 200 <= status < 300:
+            self._retry(entry, attempt, schedule_time)
+        firing = Firing(job.name, schedule_time, attempt, status)
+        self.history.append(firing)
+        return firing
+
+    def _retry(self, entry: _Entry, attempt: int, schedule_time: float):
+        retry = entry.job.retry_config
+        if attempt >= retry.retry_count:
+            return
+        min_backoff = _seconds(retry.min_backoff_duration) or 5
+        max_backoff = _seconds(retry.max_backoff_duration) or 3600
+        backoff = min(min_backoff * 2 ** min(attempt, retry.max_doublings), max_backoff)
+        max_duration = _seconds(retry.max_retry_duration)
+        if max_duration and self.now + backoff - schedule_time > max_duration:
+            return
+        with self._lock:
+            heapq.heappush(
+                self._heap,
+                (
+                    self.now + backoff,
+                    next(self._seq),
+                    entry.job.name,
+                    entry.generation,
+                    attempt + 1,
+                    schedule_time,
+                ),
+            )
+
+
+def _copy(job: scheduler_v1.Job) -> scheduler_v1.Job:
+    return scheduler_v1.Job.deserialize(scheduler_v1.Job.serialize(job))
+
+
+def _returned(job: scheduler_v1.Job) -> scheduler_v1.Job:
+    job = _copy(job)
+    # Added by Cloud Scheduler to every job
+    job.http_target.headers["User-Agent"] = "Google-Cloud-Scheduler"
+    return job
+
+
+def _seconds(duration) -> float:
+    # proto-plus returns datetime.timedelta for Duration fields
+    if duration is None:
+        return 0
+    if hasattr(duration, "total_seconds"):
+        return duration.total_seconds()
+    return duration.seconds + duration.nanos / 1e9
+
+
+def _timestamp(ts: float):
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _rfc3339(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,168 @@
+# Standard Library Imports
+import asyncio
+import cProfile
+import functools
+import logging
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from contextvars import ContextVar
+from typing import Awaitable
+from typing import Callable
+from typing import Optional
+
+# Third Party Imports
+from fastapi import Request
+from fastapi import Response
+from fastapi.routing import APIRoute
+from starlette.concurrency import run_in_threadpool
+
+# Imports from this repository
+from fastapi_cloud_tasks.dependencies import cloud_tasks_headers
+
+logger = logging.getLogger(__name__)
+
+# Sent by `.options(profile=True)` to ask the worker for a profile of that task
+PROFILE_HEADER = "X-Fastapi-Cloud-Tasks-Profile"
+
+# Only one profiler can be active in a process (Python 3.12+ refuses a second one)
+_active = threading.Lock()
+
+# Profile to enable around a sync endpoint, set for the sampled request only
+_current_profile: ContextVar[Optional[cProfile.Profile]] = ContextVar(
+    "fastapi_cloud_tasks_profile", default=None
+)
+
+_unsafe = re.compile(r"[^A-Za-z0-9_-]+")
+
+
+class TaskProfiler:
+    """
+    Profiles a sampled fraction of task executions with cProfile and writes `.prof` files to `directory`.
+
+    Sampling is decided by the task name, so all attempts of a sampled task are profiled.
+    Tasks sent with `.options(profile=True)` are always profiled when `allow_header` is set.
+    Only the newest `max_profiles` files are kept.
+
+    `def` endpoints are profiled on the thread they run on, dependencies are not included.
+    Note: for `async def` handlers, the profile also has whatever else ran on the event loop meanwhile.
+    Executions that start while another one is being profiled are not profiled.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        *,
+        sample_rate: float = 0.01,
+        max_profiles: int = 100,
+        allow_header: bool = True,
+    ) -> None:
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_profiles = max_profiles
+        self.allow_header = allow_header
+        os.makedirs(directory, exist_ok=True)
+
+    def sampled(self, task_name: str) -> bool:
+        if not task_name:
+            return random.random() < self.sample_rate
+        # Stable for a given task name, spread evenly over [0, 1)
+        return zlib.crc32(task_name.encode()) / 2**32 < self.sample_rate
+
+    def wrap(
+        self, route_handler: Callable[[Request], Awaitable[Response]], route: APIRoute
+    ):
+        """
+        Wraps the handler returned by `route.get_route_handler()`.
+        """
+        name = route.unique_id
+        # Sync endpoints run on a threadpool thread and cProfile only sees the thread it was enabled on
+        threaded = not asyncio.iscoroutinefunction(route.dependant.call)
+        if threaded and not getattr(route.dependant.call, "_profiled", False):
+            route.dependant.call = _profiled_call(route.dependant.call)
+
+        async def profiled_handler(request: Request) -> Response:
+            task_name = cloud_tasks_headers(request).task_name
+            forced = self.allow_header and PROFILE_HEADER in request.headers
+            if not (forced or self.sampled(task_name)):
+                return await route_handler(request)
+            if not _active.acquire(blocking=False):
+                return await route_handler(request)
+
+            profile = cProfile.Profile()
+            if threaded:
+                # Enabled by the endpoint's thread, the context var is copied to it
+                token = _current_profile.set(profile)
+                try:
+                    return await route_handler(request)
+                finally:
+                    _current_profile.reset(token)
+                    _active.release()
+                    if profile.getstats():
+                        await self._write_async(profile, name, task_name)
+
+            try:
+                profile.enable()
+            except ValueError:
+                # Some other profiler is running
+                _active.release()
+                return await route_handler(request)
+            try:
+                return await route_handler(request)
+            finally:
+                profile.disable()
+                _active.release()
+                await self._write_async(profile, name, task_name)
+
+        return profiled_handler
+
+    async def _write_async(self, profile: cProfile.Profile, name: str, task_name: str):
+        try:
+            await run_in_threadpool(self._write, profile, name, task_name)
+        except Exception:
+            logger.exception("Could not write profile for %s", name)
+
+    def _write(self, profile: cProfile.Profile, name: str, task_name: str):
+        # Task names are full paths, the last part is the id
+        task_id = _unsafe.sub("_", task_name.rsplit("/", 1)[-1]) or "unnamed"
+        path = os.path.join(
+            self.directory,
+            f"{int(time.time() * 1000)}-{_unsafe.sub('_', name)}-{task_id}.prof",
+        )
+        profile.dump_stats(path)
+        self._prune()
+
+    def _prune(self):
+        profiles = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".prof"):
+                profiles.append((entry.stat().st_mtime, entry.path))
+        profiles.sort()
+        for (_, path) in profiles[: max(len(profiles) - self.max_profiles, 0)]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def _profiled_call(call: Callable) -> Callable:
+    @functools.wraps(call)
+    def profiled_call(*args, **kwargs):
+        profile = _current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        try:
+            profile.enable()
+        except ValueError:
+            # Some other profiler is running
+            return call(*args, **kwargs)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profile.disable()
+
+    profiled_call._profiled = True
+    return profiled_call
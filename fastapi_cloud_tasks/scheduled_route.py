@@ -1,11 +1,18 @@
 # Standard Library Imports
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
 from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
 
 # Third Party Imports
 from fastapi.routing import APIRoute
-from google.cloud import scheduler_v1
 
 # Imports from this repository
+from fastapi_cloud_tasks.circuit_breaker import CircuitBreaker
+from fastapi_cloud_tasks.clients import scheduler_client
+from fastapi_cloud_tasks.executor import DelayExecutor
 from fastapi_cloud_tasks.hooks import ScheduledHook
 from fastapi_cloud_tasks.hooks import noop_hook
 from fastapi_cloud_tasks.scheduler import Scheduler
@@ -18,11 +25,13 @@ def ScheduledRouteBuilder(
     job_create_timeout: float = 10.0,
     pre_create_hook: ScheduledHook = None,
     client=None,
+    executor: DelayExecutor = None,
+    circuit_breaker: CircuitBreaker = None,
 ):
     """
     Returns a Mixin that should be used to override route_class.
 
-    It adds a .scheduler method to the original endpoint.
+    It adds .scheduler and .scheduler_many methods to the original endpoint.
 
     Example:
     ```
@@ -38,15 +47,22 @@ def ScheduledRouteBuilder(
     ```
     """
     if client is None:
-        client = scheduler_v1.CloudSchedulerClient()
+        client = scheduler_client()
+
+    if executor is None:
+        executor = DelayExecutor()
 
     if pre_create_hook is None:
         pre_create_hook = noop_hook
 
     class ScheduledRouteMixin(APIRoute):
+        # Shared by all routes of this builder, exposed for monitoring (`.executor.stats()`)
+        executor: DelayExecutor = None
+
         def get_route_handler(self) -> Callable:
             original_route_handler = super().get_route_handler()
             self.endpoint.scheduler = self.schedulerOptions
+            self.endpoint.scheduler_many = self.scheduler_many
             return original_route_handler
 
         def schedulerOptions(self, *, name, schedule, **options) -> Scheduler:
@@ -58,10 +74,63 @@ def ScheduledRouteBuilder(
                 job_create_timeout=job_create_timeout,
                 name=name,
                 schedule=schedule,
+                executor=executor,
+                circuit_breaker=circuit_breaker,
             )
 
             schedulerOpts.update(options)
 
             return Scheduler(route=self, **schedulerOpts)
 
+        def scheduler_many(
+            self,
+            variants: List[Tuple[str, str, Dict[str, Any]]],
+            *,
+            max_workers: int = 16,
+            **options,
+        ) -> list:
+            """
+            Create or update one job per (name, schedule, kwargs) variant.
+
+            Existing jobs are listed once and all variants are reconciled concurrently.
+            Returns, per variant, True if the job was (re)created, False if unchanged or the exception raised.
+            """
+            schedulers = [
+                (self.schedulerOptions(name=name, schedule=schedule, **options), kwargs)
+                for (name, schedule, kwargs) in variants
+            ]
+            # Build everything first so bad arguments fail before any job is touched
+            requests = [s._job_request(**kwargs) for (s, kwargs) in schedulers]
+            if len(requests) == 0:
+                return []
+
+            existing = None
+            parent = schedulers[0][0].location_path
+            try:
+                first = schedulers[0][0]
+                existing = {
+                    job.name: job
+                    for job in first._call(first.client.list_jobs, parent=parent)
+                }
+            except Exception:
+                # Fall back to one get_job per variant
+                pass
+
+            def reconcile(s: Scheduler, request):
+                try:
+                    return s._reconcile(request=request, existing=existing)
+                except Exception as ex:
+                    return ex
+
+            with ThreadPoolExecutor(
+                max_workers=min(max_workers, len(requests))
+            ) as pool:
+                futures = [
+                    pool.submit(reconcile, s, r)
+                    for ((s, _), r) in zip(schedulers, requests)
+                ]
+                return [f.result() for f in futures]
+
+    ScheduledRouteMixin.executor = executor
+
     return ScheduledRouteMixin
@@ -1,4 +1,5 @@
 # Standard Library Imports
+import asyncio
 
 # Third Party Imports
 from fastapi.routing import APIRoute
@@ -6,8 +7,13 @@ from google.cloud import scheduler_v1
 from google.protobuf import duration_pb2
 
 # Imports from this repository
+from fastapi_cloud_tasks.circuit_breaker import CircuitBreaker
 from fastapi_cloud_tasks.exception import BadMethodException
+from fastapi_cloud_tasks.executor import DelayExecutor
+from fastapi_cloud_tasks.executor import default_executor
 from fastapi_cloud_tasks.hooks import ScheduledHook
+from fastapi_cloud_tasks.hooks import split_hook
+from fastapi_cloud_tasks.hooks import template_cache
 from fastapi_cloud_tasks.requester import Requester
 
 
@@ -26,6 +32,8 @@ class Scheduler(Requester):
         retry_config: scheduler_v1.RetryConfig = None,
         time_zone: str = "UTC",
         force: bool = False,
+        executor: DelayExecutor = None,
+        circuit_breaker: CircuitBreaker = None,
     ) -> None:
         super().__init__(route=route, base_url=base_url)
         if name == "":
@@ -54,61 +62,146 @@ class Scheduler(Requester):
         self.client = client
         self.pre_create_hook = pre_create_hook
         self.force = force
+        self.executor = executor or default_executor()
+        self.circuit_breaker = circuit_breaker
 
     def schedule(self, **kwargs):
-        # Create http request
-        request = scheduler_v1.HttpTarget()
-        request.http_method = self.method
-        request.uri = self._url(values=kwargs)
-        request.headers = self._headers(values=kwargs)
+        request = self._job_request(**kwargs)
+        self._reconcile(request=request)
+
+    def _reconcile(
+        self, *, request: scheduler_v1.CreateJobRequest, existing: dict = None
+    ) -> bool:
+        """
+        Creates the job if it's missing or has changed. Returns True if the job was (re)created.
+
+        `existing` is a dict of job name -> job from a single list call, otherwise the job is fetched.
+        """
+        if existing is None:
+            if not (self.force or self._has_changed(request=request)):
+                return False
+            # Delete and create job
+            self.delete()
+        else:
+            job = existing.get(request.job.name)
+            if job is not None:
+                if not (self.force or _differs(job, request)):
+                    return False
+                self.delete()
+        self._call(
+            self.client.create_job, request=request, timeout=self.job_create_timeout
+        )
+        return True
+
+    def _job_request(self, **kwargs) -> scheduler_v1.CreateJobRequest:
+        # Start from a copy of the template, static hooks have already been applied to it
+        (template, dynamic_hook) = _job_template(
+            self.location_path,
+            self.method,
+            self.cron_schedule,
+            self.time_zone,
+            scheduler_v1.RetryConfig.serialize(self.retry_config),
+            self.pre_create_hook,
+        )
+        request = scheduler_v1.CreateJobRequest.wrap(_clone(template))
+        job = request.job
+        job.name = self.job_id
+
+        # Fill http target
+        target = job.http_target
+        target.uri = self._url(values=kwargs)
+        # Headers set by static hooks win, same as when hooks ran after the request was built
+        target.headers.update(
+            {
+                k: v
+                for (k, v) in self._headers(values=kwargs).items()
+                if k not in target.headers
+            }
+        )
 
         body = self._body(values=kwargs)
         if body:
-            request.body = body
-
-        # Scheduled the task
-        job = scheduler_v1.Job(
-            name=self.job_id,
-            http_target=request,
-            schedule=self.cron_schedule,
-            retry_config=self.retry_config,
-            time_zone=self.time_zone,
-        )
+            target.body = body
 
-        request = scheduler_v1.CreateJobRequest(parent=self.location_path, job=job)
+        return dynamic_hook(request)
 
-        request = self.pre_create_hook(request)
-
-        if self.force or self._has_changed(request=request):
-            # Delete and create job
-            self.delete()
-            self.client.create_job(request=request, timeout=self.job_create_timeout)
+    def schedule_async(self, **kwargs) -> asyncio.Future:
+        """
+        Same as schedule, but runs on the executor's threads and returns an awaitable.
+        """
+        return self.executor.run(self.schedule, **kwargs)
 
     def _has_changed(self, request: scheduler_v1.CreateJobRequest):
         try:
-            job = self.client.get_job(name=request.job.name)
-            # Remove things that are either output only or GCP adds by default
-            job.user_update_time = None
-            job.state = None
-            job.status = None
-            job.last_attempt_time = None
-            job.schedule_time = None
-            del job.http_target.headers["User-Agent"]
-            # Proto compare works directly with `__eq__`
-            return job != request.job
+            job = self._call(self.client.get_job, name=request.job.name)
+            return _differs(job, request)
         except Exception:
             return True
         return False
 
+    def _call(self, fn, **kwargs):
+        if self.circuit_breaker is not None:
+            return self.circuit_breaker.call(fn, **kwargs)
+        return fn(**kwargs)
+
     def delete(self):
         # We return true or exception because you could have the delete code on multiple instances
         try:
-            self.client.delete_job(name=self.job_id, timeout=self.job_create_timeout)
+            self._call(
+                self.client.delete_job,
+                name=self.job_id,
+                timeout=self.job_create_timeout,
+            )
             return True
         except Exception as ex:
             return ex
 
 
+def _differs(job: scheduler_v1.Job, request: scheduler_v1.CreateJobRequest) -> bool:
+    try:
+        # Remove things that are either output only or GCP adds by default
+        job.user_update_time = None
+        job.state = None
+        job.status = None
+        job.last_attempt_time = None
+        job.schedule_time = None
+        job.http_target.headers.pop("User-Agent", None)
+        # Proto compare works directly with `__eq__`
+        return job != request.job
+    except Exception:
+        return True
+
+
+@template_cache
+def _job_template(
+    location_path: str,
+    method,
+    schedule: str,
+    time_zone: str,
+    retry_config: bytes,
+    pre_create_hook,
+):
+    (static_hooks, dynamic_hook) = split_hook(pre_create_hook)
+    request = scheduler_v1.CreateJobRequest(
+        parent=location_path,
+        job=scheduler_v1.Job(
+            http_target=scheduler_v1.HttpTarget(http_method=method),
+            schedule=schedule,
+            retry_config=scheduler_v1.RetryConfig.deserialize(retry_config),
+            time_zone=time_zone,
+        ),
+    )
+    for hook in static_hooks:
+        request = hook(request)
+    return scheduler_v1.CreateJobRequest.pb(request), dynamic_hook
+
+
+def _clone(pb):
+    copy = type(pb)()
+    copy.CopyFrom(pb)
+    return copy
+
+
 def _scheduler_method(methods):
     methodMap = {
         "POST": scheduler_v1.HttpMethod.POST,
@@ -0,0 +1,320 @@
+# Standard Library Imports
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+# Third Party Imports
+from google.api_core.exceptions import AlreadyExists
+from google.api_core.exceptions import RetryError
+from google.api_core.exceptions import ServerError
+from google.api_core.exceptions import TooManyRequests
+from google.cloud import tasks_v2
+
+# Imports from this repository
+from fastapi_cloud_tasks.exception import CircuitOpenException
+
+logger = logging.getLogger(__name__)
+
+# Errors that mean "try again later", anything else would fail again on replay
+SPOOLABLE_EXCEPTIONS = (ServerError, TooManyRequests, RetryError, CircuitOpenException)
+
+# length, crc32
+_HEADER = struct.Struct("<II")
+
+
+class Spool:
+    """
+    Append only, segmented, memory mapped log of `CreateTaskRequest`s that couldn't be sent.
+
+    Appends are a memcpy into the mapped segment, no syscalls on the hot path.
+    Each process writes to its own subdirectory (named after its pid) and segments are only opened
+    on the first append, so a spool created before a pre-fork server forks is safe to share.
+    Segments of processes that are gone are adopted by the next replayer.
+    """
+
+    def __init__(self, directory: str, *, segment_size: int = 16 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+        self._reset()
+
+    def append(self, request: tasks_v2.CreateTaskRequest):
+        payload = tasks_v2.CreateTaskRequest.serialize(request)
+        record = _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        # Room for an empty header at the end marks where the segment stops
+        if len(record) + _HEADER.size > self.segment_size:
+            raise ValueError(
+                f"Request of {len(payload)} bytes doesn't fit in a spool segment"
+            )
+        self._check_pid()
+        with self._lock:
+            if self._map is None:
+                self._open_segment()
+            elif self._offset + len(record) + _HEADER.size > self.segment_size:
+                self._close_segment()
+                self._open_segment()
+            self._map[self._offset : self._offset + len(record)] = record
+            self._offset += len(record)
+
+    def seal(self):
+        """
+        Close the active segment (if it has anything) so that it can be replayed.
+        """
+        self._check_pid()
+        with self._lock:
+            if self._map is not None and self._offset > 0:
+                self._close_segment()
+
+    def sealed_segments(self) -> List[str]:
+        """
+        Sealed segments of this process, including the ones adopted from processes that are gone.
+        """
+        self._check_pid()
+        with self._lock:
+            self._adopt()
+            directory = self._process_directory()
+            if not os.path.isdir(directory):
+                return []
+            return [
+                os.path.join(directory, name)
+                for name in sorted(os.listdir(directory))
+                if name.endswith(".spool")
+            ]
+
+    def read(
+        self, path: str, offset: int = 0
+    ) -> Iterator[Tuple[int, tasks_v2.CreateTaskRequest]]:
+        """
+        Yields (offset after the record, request) starting at offset.
+        """
+        with open(path, "rb") as f:
+            data = f.read()
+        while offset + _HEADER.size <= len(data):
+            (length, crc) = _HEADER.unpack_from(data, offset)
+            if length == 0:
+                return
+            start = offset + _HEADER.size
+            payload = data[start : start + length]
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                # Torn write from a crash, nothing valid after this
+                logger.warning("Corrupt record in %s at %d", path, offset)
+                return
+            offset = start + length
+            yield offset, tasks_v2.CreateTaskRequest.deserialize(payload)
+
+    def done_offset(self, path: str) -> int:
+        try:
+            with open(f"{path}.done") as f:
+                return int(f.read() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def mark_done(self, path: str, offset: int):
+        tmp = f"{path}.done.tmp"
+        with open(tmp, "w") as f:
+            f.write(str(offset))
+        os.replace(tmp, f"{path}.done")
+
+    def remove(self, path: str):
+        for p in (path, f"{path}.done"):
+            try:
+                os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def _reset(self):
+        # In a forked child the parent's mapping, offset and lock must not be used
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._next = None
+        self._active_path = None
+        self._file = None
+        self._map = None
+        self._offset = 0
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def _close_segment(self):
+        # Must be called with the lock held
+        self._map.flush()
+        self._map.close()
+        self._file.close()
+        os.rename(self._active_path, self._sealed_path(self._active_path))
+        self._active_path = None
+        self._file = None
+        self._map = None
+        self._offset = 0
+
+    def _open_segment(self):
+        # Must be called with the lock held
+        self._ensure_next()
+        self._active_path = self._path(self._next, ".active")
+        self._next += 1
+        self._file = open(self._active_path, "w+b")
+        self._file.truncate(self.segment_size)
+        self._map = mmap.mmap(self._file.fileno(), self.segment_size)
+        self._offset = 0
+
+    def _ensure_next(self):
+        # Must be called with the lock held
+        if self._next is not None:
+            return
+        directory = self._process_directory()
+        os.makedirs(directory, exist_ok=True)
+        numbers = [-1]
+        for name in os.listdir(directory):
+            number = _segment_number(name)
+            if number is None:
+                continue
+            numbers.append(number)
+            if name.endswith(".active"):
+                # Left by an earlier process that had the same pid
+                path = os.path.join(directory, name)
+                os.rename(path, self._sealed_path(path))
+        self._next = max(numbers) + 1
+
+    def _adopt(self):
+        # Must be called with the lock held
+        self._ensure_next()
+        for name in os.listdir(self.directory):
+            if not name.isdigit() or int(name) == self._pid or _alive(int(name)):
+                continue
+            directory = os.path.join(self.directory, name)
+            for segment in sorted(os.listdir(directory)):
+                if _segment_number(segment) is None:
+                    continue
+                path = os.path.join(directory, segment)
+                target = self._path(self._next, ".spool")
+                try:
+                    # Whoever moves the segment first owns it (and its .done offset)
+                    os.rename(path, target)
+                except FileNotFoundError:
+                    continue
+                self._next += 1
+                try:
+                    os.rename(f"{self._sealed_path(path)}.done", f"{target}.done")
+                except FileNotFoundError:
+                    pass
+            try:
+                os.rmdir(directory)
+            except OSError:
+                pass
+
+    def _process_directory(self) -> str:
+        return os.path.join(self.directory, str(self._pid))
+
+    def _path(self, number: int, suffix: str) -> str:
+        return os.path.join(self._process_directory(), f"segment-{number:012d}{suffix}")
+
+    def _sealed_path(self, path: str) -> str:
+        return path[: -len(".active")] + ".spool" if path.endswith(".active") else path
+
+
+def _segment_number(name: str):
+    for suffix in (".spool", ".active"):
+        if name.startswith("segment-") and name.endswith(suffix):
+            return int(name[len("segment-") : -len(suffix)])
+    return None
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Exists, owned by someone else
+        return True
+    return True
+
+
+class SpoolReplayer:
+    """
+    Sends spooled requests in batches once Cloud Tasks is reachable again.
+
+    Call `drain` periodically or `start` a background thread. Delivery is at least once.
+    """
+
+    def __init__(
+        self,
+        *,
+        spool: Spool,
+        client: tasks_v2.CloudTasksClient,
+        batch_size: int = 100,
+        max_workers: int = 8,
+        interval: float = 5.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self.spool = spool
+        self.client = client
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.interval = interval
+        self.timeout = timeout
+        self._stop = threading.Event()
+        self._thread = None
+
+    def drain(self) -> int:
+        """
+        Replay everything spooled so far. Returns the number of tasks sent.
+        Stops at the first "try again later" error.
+        """
+        self.spool.seal()
+        sent = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for path in self.spool.sealed_segments():
+                records = list(self.spool.read(path, self.spool.done_offset(path)))
+                for i in range(0, len(records), self.batch_size):
+                    batch = records[i : i + self.batch_size]
+                    results = list(pool.map(self._send, [r for (_, r) in batch]))
+                    # Progress is only recorded up to the first failure, the rest is sent again later
+                    done = None
+                    for ((offset, _), ok) in zip(batch, results):
+                        if not ok:
+                            break
+                        sent += 1
+                        done = offset
+                    if done is not None:
+                        self.spool.mark_done(path, done)
+                    if not all(results):
+                        return sent
+                self.spool.remove(path)
+        return sent
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _send(self, request: tasks_v2.CreateTaskRequest) -> bool:
+        try:
+            self.client.create_task(request=request, timeout=self.timeout)
+        except AlreadyExists:
+            pass
+        except SPOOLABLE_EXCEPTIONS:
+            return False
+        except Exception:
+            # Would never succeed, drop it
+            logger.exception("Dropping spooled task for %s", request.parent)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.drain()
+            except Exception:
+                logger.exception("Spool replay failed")
@@ -1,9 +1,10 @@
 # Third Party Imports
-import grpc
 from google.api_core.exceptions import AlreadyExists
 from google.cloud import scheduler_v1
 from google.cloud import tasks_v2
-from google.cloud.tasks_v2.services.cloud_tasks import transports
+
+# Imports from this repository
+from fastapi_cloud_tasks.clients import tasks_client
 
 
 def location_path(*, project: str, location: str, **ignored):
@@ -37,6 +38,5 @@ def ensure_queue(
 
 
 def emulator_client(*, host="localhost:8123"):
-    channel = grpc.insecure_channel(host)
-    transport = transports.CloudTasksGrpcTransport(channel=channel)
-    return tasks_v2.CloudTasksClient(transport=transport)
+    # Shared with every other emulator_client for the same host
+    return tasks_client(host=host, insecure=True)
@@ -0,0 +1,366 @@
+# Standard Library Imports
+import base64
+import hashlib
+import hmac
+import json
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import List
+from typing import Mapping
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Union
+
+# Third Party Imports
+from google.api_core.exceptions import AlreadyExists
+from google.cloud import tasks_v2
+
+# Imports from this repository
+from fastapi_cloud_tasks.exception import WorkflowKeyException
+
+# Header carrying the remaining tasks of a chain, as a JSON list
+CHAIN_HEADER = "X-Fastapi-Cloud-Tasks-Chain"
+# Header carrying group membership and the callback of a chord
+CHORD_HEADER = "X-Fastapi-Cloud-Tasks-Chord"
+# Both are signed with the builders' `workflow_key`: "<hmac sha256 hex>.<value>"
+
+
+class Signature:
+    """
+    A task invocation (route + arguments) that hasn't been sent yet.
+
+    Create one with `endpoint.signature(...)` or `endpoint.options(...).signature(...)`.
+    Arguments are validated when the signature is sent, not when it is created.
+    """
+
+    def __init__(self, *, delayer, values: Dict) -> None:
+        self.delayer = delayer
+        self.values = values
+
+    def delay(self):
+        return self.delayer._create(self._task_request())
+
+    def _task_request(
+        self, headers: Dict[str, str] = None
+    ) -> tasks_v2.CreateTaskRequest:
+        request = self.delayer._task_request(**self.values)
+        for (k, v) in (headers or {}).items():
+            request.task.http_request.headers[k] = v
+        return request
+
+
+class Chain:
+    """
+    Run signatures one after the other.
+
+    The next task is enqueued by the worker only after the current one returns a 2xx response.
+
+    Example:
+    ```
+    chain(fetch.signature(url=url), parse.signature(url=url), notify.signature(user_id=uid)).delay()
+    ```
+    """
+
+    def __init__(self, *signatures: Signature) -> None:
+        if len(signatures) == 0:
+            raise ValueError("chain needs at least one signature")
+        self.signatures = signatures
+
+    def delay(self):
+        # The first task carries the rest of the chain as a flat list, each worker passes on what's left.
+        # Nesting each task in the previous one would grow the header exponentially with the length.
+        (first, *rest) = self.signatures
+        headers = {}
+        if rest:
+            key = _shared_key(self.signatures)
+            headers[CHAIN_HEADER] = _sign(
+                key,
+                CHAIN_HEADER,
+                json.dumps([_encode(sig._task_request()) for sig in rest]),
+            )
+        return first.delayer._create(first._task_request(headers))
+
+
+class Group:
+    """
+    Run signatures in parallel.
+
+    Example:
+    ```
+    group(*[resize.signature(image_id=i) for i in image_ids]).delay()
+    ```
+    """
+
+    def __init__(self, *signatures: Signature, max_workers: int = 16) -> None:
+        self.signatures = signatures
+        self.max_workers = max_workers
+
+    def delay(self):
+        return self._send([sig._task_request() for sig in self.signatures])
+
+    def _send(self, requests: List[tasks_v2.CreateTaskRequest]):
+        if len(requests) == 0:
+            return []
+        workers = min(self.max_workers, len(requests))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(sig.delayer._create, request)
+                for (sig, request) in zip(self.signatures, requests)
+            ]
+            return [f.result() for f in futures]
+
+
+class Chord:
+    """
+    Run a group in parallel and enqueue `callback` once every member of the group returned a 2xx response.
+
+    Completion is counted by the worker in the `group_store` of the route builder.
+
+    Example:
+    ```
+    chord(group(*[resize.signature(image_id=i) for i in image_ids]), notify.signature(user_id=uid)).delay()
+    ```
+    """
+
+    def __init__(self, header: Group, callback: Signature) -> None:
+        self.header = header
+        self.callback = callback
+
+    def delay(self):
+        size = len(self.header.signatures)
+        if size == 0:
+            return [self.callback.delay()]
+
+        key = _shared_key(self.header.signatures)
+        callback = _encode(self.callback._task_request())
+        group_id = uuid.uuid4().hex
+        requests = []
+        for (member, sig) in enumerate(self.header.signatures):
+            meta = dict(id=group_id, member=member, size=size, callback=callback)
+            signed = _sign(key, CHORD_HEADER, json.dumps(meta))
+            requests.append(sig._task_request({CHORD_HEADER: signed}))
+        return self.header._send(requests)
+
+
+class MemoryGroupStore:
+    """
+    Keeps group completion in process memory.
+
+    Only correct when all members of a group run on the same process. Good for tests and single instance workers.
+    """
+
+    def __init__(self, max_completed: int = 10_000) -> None:
+        self.max_completed = max_completed
+        self._lock = threading.Lock()
+        self._groups: Dict[str, Set[int]] = {}
+        # group id -> member that completed it, remembered for retries of that member
+        self._completed: "OrderedDict[str, int]" = OrderedDict()
+
+    def add(self, group_id: str, member: int, size: int) -> bool:
+        """
+        Mark member as done. Returns True for the member that completes the group, every time it is added.
+        """
+        with self._lock:
+            if group_id in self._completed:
+                return self._completed[group_id] == member
+            members = self._groups.setdefault(group_id, set())
+            if member in members:
+                return False
+            members.add(member)
+            if len(members) < size:
+                return False
+            del self._groups[group_id]
+            self._completed[group_id] = member
+            if len(self._completed) > self.max_completed:
+                self._completed.popitem(last=False)
+            return True
+
+
+class SQLiteGroupStore:
+    """
+    Keeps group completion in a SQLite database.
+
+    Works across processes on the same machine when given a file path.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fastapi_cloud_tasks_groups ("
+            "group_id TEXT NOT NULL, member INTEGER NOT NULL, PRIMARY KEY (group_id, member))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fastapi_cloud_tasks_completed_groups ("
+            "group_id TEXT NOT NULL PRIMARY KEY, member INTEGER NOT NULL)"
+        )
+
+    def add(self, group_id: str, member: int, size: int) -> bool:
+        """
+        Mark member as done. Returns True for the member that completes the group, every time it is added.
+        """
+        with self._lock:
+            # IMMEDIATE takes the write lock upfront so that two processes can't both see the last member
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                completed = self._conn.execute(
+                    "SELECT member FROM fastapi_cloud_tasks_completed_groups WHERE group_id = ?",
+                    (group_id,),
+                ).fetchone()
+                if completed is not None:
+                    self._conn.execute("COMMIT")
+                    # A retry of the completing member, its callback may not have been sent
+                    return completed[0] == member
+                cursor = self._conn.execute(
+                    "INSERT OR IGNORE INTO fastapi_cloud_tasks_groups (group_id, member) VALUES (?, ?)",
+                    (group_id, member),
+                )
+                if cursor.rowcount == 0:
+                    self._conn.execute("COMMIT")
+                    return False
+                (count,) = self._conn.execute(
+                    "SELECT COUNT(*) FROM fastapi_cloud_tasks_groups WHERE group_id = ?",
+                    (group_id,),
+                ).fetchone()
+                done = count >= size
+                if done:
+                    self._conn.execute(
+                        "INSERT INTO fastapi_cloud_tasks_completed_groups (group_id, member) VALUES (?, ?)",
+                        (group_id, member),
+                    )
+                    self._conn.execute(
+                        "DELETE FROM fastapi_cloud_tasks_groups WHERE group_id = ?",
+                        (group_id,),
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return done
+
+
+def chain(*signatures: Signature) -> Chain:
+    return Chain(*signatures)
+
+
+def group(*signatures: Signature, max_workers: int = 16) -> Group:
+    return Group(*signatures, max_workers=max_workers)
+
+
+def chord(header: Group, callback: Signature) -> Chord:
+    return Chord(header, callback)
+
+
+def has_follow_ups(headers: Mapping[str, str]) -> bool:
+    return CHAIN_HEADER in headers or CHORD_HEADER in headers
+
+
+def verify_follow_ups(
+    headers: Mapping[str, str], *, key: Optional[Union[str, bytes]]
+) -> bool:
+    """
+    True if every follow up header was signed with key. Always False without a key.
+    """
+    for name in (CHAIN_HEADER, CHORD_HEADER):
+        if name in headers and _verified(key, name, headers[name]) is None:
+            return False
+    return True
+
+
+def enqueue_follow_ups(
+    *,
+    headers: Mapping[str, str],
+    client: tasks_v2.CloudTasksClient,
+    group_store,
+    key: Union[str, bytes],
+    timeout: float = 10.0,
+):
+    """
+    Called by the worker after a task succeeded. Enqueues the next task of a chain and the chord callback.
+
+    Headers that aren't signed with key are ignored.
+    """
+    requests = []
+    chained = headers.get(CHAIN_HEADER) and _verified(
+        key, CHAIN_HEADER, headers[CHAIN_HEADER]
+    )
+    if chained:
+        (following, *rest) = json.loads(chained)
+        request = _decode(following)
+        if rest:
+            request.task.http_request.headers[CHAIN_HEADER] = _sign(
+                key, CHAIN_HEADER, json.dumps(rest)
+            )
+        requests.append(request)
+
+    chorded = headers.get(CHORD_HEADER) and _verified(
+        key, CHORD_HEADER, headers[CHORD_HEADER]
+    )
+    if chorded:
+        meta = json.loads(chorded)
+        if group_store.add(meta["id"], meta["member"], meta["size"]):
+            requests.append(_decode(meta["callback"]))
+
+    for request in requests:
+        try:
+            client.create_task(request=request, timeout=timeout)
+        except AlreadyExists:
+            # Named tasks that were already enqueued by a previous attempt
+            pass
+
+
+def _shared_key(signatures: Sequence[Signature]) -> Union[str, bytes]:
+    keys = {getattr(sig.delayer, "workflow_key", None) for sig in signatures}
+    if None in keys:
+        raise WorkflowKeyException(
+            "chain/chord need a workflow_key on the route builders of their tasks"
+        )
+    if len(keys) > 1:
+        raise WorkflowKeyException(
+            "All tasks of a chain/chord must use the same workflow_key"
+        )
+    return keys.pop()
+
+
+def _mac(key: Union[str, bytes], name: str, value: str) -> str:
+    if isinstance(key, str):
+        key = key.encode()
+    # The header name is signed too, so that a chord value can't be passed off as a chain
+    message = f"{name.lower()}\n{value}".encode()
+    return hmac.new(key, message, hashlib.sha256).hexdigest()
+
+
+def _sign(key: Union[str, bytes], name: str, value: str) -> str:
+    return f"{_mac(key, name, value)}.{value}"
+
+
+def _verified(
+    key: Optional[Union[str, bytes]], name: str, signed: str
+) -> Optional[str]:
+    """
+    The signed value, or None if it wasn't signed with key.
+    """
+    if not key:
+        return None
+    (mac, _, value) = signed.partition(".")
+    # Bytes, compare_digest refuses non ASCII str (headers come from anyone)
+    if not hmac.compare_digest(mac.encode(), _mac(key, name, value).encode()):
+        return None
+    return value
+
+
+def _encode(request: tasks_v2.CreateTaskRequest) -> str:
+    return base64.urlsafe_b64encode(
+        tasks_v2.CreateTaskRequest.serialize(request)
+    ).decode()
+
+
+def _decode(value: str) -> tasks_v2.CreateTaskRequest:
+    return tasks_v2.CreateTaskRequest.deserialize(base64.urlsafe_b64decode(value))
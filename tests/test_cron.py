@@ -0,0 +1,139 @@
+# Standard Library Imports
+from datetime import datetime
+from datetime import timezone
+
+# Third Party Imports
+import pytest
+
+# Imports from this repository
+from fastapi_cloud_tasks.cron import CronSchedule
+from fastapi_cloud_tasks.cron import _parse_field
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+def fire_times(schedule, start, count):
+    times = []
+    when = start
+    for _ in range(count):
+        when = schedule.next_after(when)
+        times.append(when)
+    return times
+
+
+@pytest.mark.parametrize(
+    "field,low,high,expected",
+    [
+        ("*/15", 0, 59, [0, 15, 30, 45]),
+        ("10-20/5", 0, 59, [10, 15, 20]),
+        ("5/20", 0, 59, [5, 25, 45]),
+        ("1,3,5-6", 0, 23, [1, 3, 5, 6]),
+        ("7", 0, 23, [7]),
+    ],
+)
+def test_parse_field(field, low, high, expected):
+    assert _parse_field(field, low, high) == expected
+
+
+def test_names():
+    schedule = CronSchedule("0 9 * jan,mar mon-fri")
+    assert schedule.months == [1, 3]
+    assert schedule.weekdays == [1, 2, 3, 4, 5]
+    # Friday 2027-01-01 09:00 -> Monday 2027-01-04 09:00 (weekend skipped)
+    assert schedule.next_after(utc(2027, 1, 1, 9, 0)) == utc(2027, 1, 4, 9, 0)
+    # End of january jumps to march
+    assert schedule.next_after(utc(2027, 1, 29, 10, 0)) == utc(2027, 3, 1, 9, 0)
+
+
+def test_sunday_as_seven():
+    assert CronSchedule("0 0 * * 7").weekdays == [0]
+    assert CronSchedule("0 0 * * 5-7").weekdays == [0, 5, 6]
+
+
+def test_macros():
+    assert CronSchedule("@hourly").next_after(utc(2026, 5, 1, 10, 30)) == utc(
+        2026, 5, 1, 11, 0
+    )
+    assert CronSchedule("@monthly").next_after(utc(2026, 12, 15)) == utc(2027, 1, 1)
+
+
+def test_step():
+    schedule = CronSchedule("*/20 * * * *")
+    assert fire_times(schedule, utc(2026, 5, 1, 23, 30), 3) == [
+        utc(2026, 5, 1, 23, 40),
+        utc(2026, 5, 2, 0, 0),
+        utc(2026, 5, 2, 0, 20),
+    ]
+
+
+def test_strictly_after():
+    schedule = CronSchedule("30 10 * * *")
+    assert schedule.next_after(utc(2026, 5, 1, 10, 30)) == utc(2026, 5, 2, 10, 30)
+    assert schedule.next_after(utc(2026, 5, 1, 10, 29, 59)) == utc(2026, 5, 1, 10, 30)
+
+
+def test_day_of_month_or_day_of_week():
+    # Both restricted: the 13th or any friday
+    schedule = CronSchedule("0 0 13 * fri")
+    assert fire_times(schedule, utc(2026, 5, 1, 1), 3) == [
+        utc(2026, 5, 8),
+        utc(2026, 5, 13),
+        utc(2026, 5, 15),
+    ]
+
+
+def test_time_zone():
+    schedule = CronSchedule("0 9 * * *", "Europe/Paris")
+    fire = schedule.next_after(utc(2026, 7, 1, 12, 0))
+    assert fire.tzinfo is schedule.tz
+    assert fire.astimezone(timezone.utc) == utc(2026, 7, 2, 7, 0)
+
+
+def test_dst_gap_skipped():
+    # 2026-03-08 02:00 -> 03:00 in New York, 02:30 doesn't exist that day
+    schedule = CronSchedule("30 2 * * *", "America/New_York")
+    fires = fire_times(schedule, utc(2026, 3, 7, 12, 0), 2)
+    assert [f.astimezone(timezone.utc) for f in fires] == [
+        utc(2026, 3, 9, 6, 30),
+        utc(2026, 3, 10, 6, 30),
+    ]
+
+
+def test_dst_fold_fires_once():
+    # 2026-11-01 02:00 -> 01:00 in New York, 01:30 happens twice
+    schedule = CronSchedule("30 1 * * *", "America/New_York")
+    fires = fire_times(schedule, utc(2026, 11, 1, 0, 0), 2)
+    assert [f.astimezone(timezone.utc) for f in fires] == [
+        utc(2026, 11, 1, 5, 30),
+        utc(2026, 11, 2, 6, 30),
+    ]
+
+
+def test_hourly_across_dst_gap():
+    schedule = CronSchedule("0 * * * *", "America/New_York")
+    # 01:00 EST is 06:00 UTC, the next hour is 03:00 EDT (07:00 UTC)
+    fire = schedule.next_after(utc(2026, 3, 8, 6, 0))
+    assert fire.astimezone(timezone.utc) == utc(2026, 3, 8, 7, 0)
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "* * * *",
+        "60 * * * *",
+        "* 24 * * *",
+        "*/0 * * * *",
+        "5-1 * * * *",
+        "* * * foo *",
+    ],
+)
+def test_invalid(expression):
+    with pytest.raises(ValueError):
+        CronSchedule(expression)
+
+
+def test_never_fires():
+    with pytest.raises(ValueError):
+        CronSchedule("0 0 30 2 *").next_after(utc(2026, 1, 1))